@@ -3,27 +3,425 @@ Econf provides functionality for interacting with Key-Value config files, like g
 
 For more information please have a look at the API
 """
-import ctypes.util
+import array
+import collections.abc
+import ctypes
+import errno
+import itertools
+import mmap
+import os
+import select
+import stat
+import struct
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field, make_dataclass
+from functools import lru_cache, wraps
 from typing import *
 from ctypes import *
 
-LIBNAME = ctypes.util.find_library("econf")
-LIBECONF = CDLL(LIBNAME)
+# libeconf is loaded on first use, ECONF_LIBRARY can point to the library to skip searching for it.
+# Modules which are slow to import (ctypes.util, asyncio, concurrent.futures, tempfile) are only imported
+# by the functions which need them.
+_DEFAULT_SONAME = "libeconf.so.0"
+_PROTOTYPES = {}
+_LIBRARY_LOCK = threading.Lock()
+
+
+class _LazyFunction:
+    # placeholder for a libeconf function which loads the library when it is called the first time
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, *args: Any) -> Any:
+        _load_library()
+        return globals()["_" + self.name](*args)
+
+
+def _bind(name: str, restype: Any, *argtypes: Any) -> Any:
+    _PROTOTYPES[name] = (restype, argtypes)
+    return _LazyFunction(name)
+
+
+def _load_library() -> None:
+    global LIBNAME, LIBECONF
+    if "LIBECONF" in globals():
+        return
+    with _LIBRARY_LOCK:
+        if "LIBECONF" in globals():
+            return
+        libname = os.environ.get("ECONF_LIBRARY")
+        try:
+            lib = CDLL(libname or _DEFAULT_SONAME)
+        except OSError:
+            if libname:
+                raise
+            import ctypes.util
+
+            libname = ctypes.util.find_library("econf")
+            if libname is None:
+                raise OSError("libeconf could not be found, set ECONF_LIBRARY to its path") from None
+            lib = CDLL(libname)
+        for name, (restype, argtypes) in _PROTOTYPES.items():
+            func = getattr(lib, name)
+            func.restype = restype
+            func.argtypes = argtypes
+            globals()["_" + name] = func
+        LIBNAME = libname or _DEFAULT_SONAME
+        LIBECONF = lib
+
+
+def __getattr__(name: str) -> Any:
+    if name in ("LIBNAME", "LIBECONF"):
+        _load_library()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# libeconf calls the callback with the name of every file and the callback data pointer. All calls go
+# through one trampoline, the data pointer is a handle to the Python callback in _CALLBACKS.
+_CALLBACK_FUNC = CFUNCTYPE(c_bool, c_char_p, c_void_p)
+_CALLBACKS = {}
+_CALLBACK_HANDLES = itertools.count(1)
+
+
+def _callback_trampoline(file_name: bytes, handle: int) -> bool:
+    state = _CALLBACKS[handle]
+    try:
+        return bool(state[0](state[1]))
+    except BaseException as e:
+        # ctypes can only print exceptions of callbacks, so it is raised again once libeconf returns
+        state[2] = e
+        return False
+
+
+_CALLBACK_TRAMPOLINE = _CALLBACK_FUNC(_callback_trampoline)
+
+
+def _call_with_callback(func: Callable, callback: Callable[[Any], bool], callback_data: Any, *args) -> int:
+    # calls func with the trampoline and the handle of the callback as last arguments
+    handle = next(_CALLBACK_HANDLES)
+    state = [callback, callback_data, None]
+    _CALLBACKS[handle] = state
+    try:
+        err = func(*args, _CALLBACK_TRAMPOLINE, handle)
+    finally:
+        del _CALLBACKS[handle]
+    if state[2] is not None:
+        raise state[2]
+    return err
+
+
+# prototypes of all used libeconf functions, bound to the library when it is loaded
+_econf_readFile = _bind(
+    "econf_readFile", c_int, POINTER(c_void_p), c_char_p, c_char_p, c_char_p
+)
+_econf_readFileWithCallback = _bind(
+    "econf_readFileWithCallback",
+    c_int,
+    POINTER(c_void_p),
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    _CALLBACK_FUNC,
+    c_void_p,
+)
+_econf_mergeFiles = _bind(
+    "econf_mergeFiles", c_int, POINTER(c_void_p), c_void_p, c_void_p
+)
+_econf_readDirs = _bind(
+    "econf_readDirs",
+    c_int,
+    POINTER(c_void_p),
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+)
+_econf_readDirsWithCallback = _bind(
+    "econf_readDirsWithCallback",
+    c_int,
+    POINTER(c_void_p),
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    _CALLBACK_FUNC,
+    c_void_p,
+)
+_econf_readDirsHistory = _bind(
+    "econf_readDirsHistory",
+    c_int,
+    POINTER(c_void_p),
+    POINTER(c_size_t),
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+)
+_econf_readDirsHistoryWithCallback = _bind(
+    "econf_readDirsHistoryWithCallback",
+    c_int,
+    POINTER(c_void_p),
+    POINTER(c_size_t),
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    c_char_p,
+    _CALLBACK_FUNC,
+    c_void_p,
+)
+_econf_newKeyFile = _bind("econf_newKeyFile", c_int, POINTER(c_void_p), c_char, c_char)
+_econf_newIniFile = _bind("econf_newIniFile", c_int, POINTER(c_void_p))
+_econf_comment_tag = _bind("econf_comment_tag", c_char, c_void_p)
+_econf_delimiter_tag = _bind("econf_delimiter_tag", c_char, c_void_p)
+_econf_set_comment_tag = _bind("econf_set_comment_tag", None, c_void_p, c_char)
+_econf_set_delimiter_tag = _bind("econf_set_delimiter_tag", None, c_void_p, c_char)
+_econf_writeFile = _bind("econf_writeFile", c_int, c_void_p, c_char_p, c_char_p)
+_econf_getPath = _bind("econf_getPath", c_char_p, c_void_p)
+_econf_getGroups = _bind(
+    "econf_getGroups",
+    c_int,
+    c_void_p,
+    POINTER(c_size_t),
+    POINTER(POINTER(c_char_p)),
+)
+_econf_getKeys = _bind(
+    "econf_getKeys",
+    c_int,
+    c_void_p,
+    c_char_p,
+    POINTER(c_size_t),
+    POINTER(POINTER(c_char_p)),
+)
+_econf_getInt64Value = _bind(
+    "econf_getInt64Value", c_int, c_void_p, c_char_p, c_char_p, POINTER(c_int64)
+)
+_econf_getUInt64Value = _bind(
+    "econf_getUInt64Value", c_int, c_void_p, c_char_p, c_char_p, POINTER(c_uint64)
+)
+_econf_getDoubleValue = _bind(
+    "econf_getDoubleValue", c_int, c_void_p, c_char_p, c_char_p, POINTER(c_double)
+)
+_econf_getStringValue = _bind(
+    "econf_getStringValue", c_int, c_void_p, c_char_p, c_char_p, POINTER(c_void_p)
+)
+_econf_getBoolValue = _bind(
+    "econf_getBoolValue", c_int, c_void_p, c_char_p, c_char_p, POINTER(c_bool)
+)
+_econf_getInt64ValueDef = _bind(
+    "econf_getInt64ValueDef",
+    c_int,
+    c_void_p,
+    c_char_p,
+    c_char_p,
+    POINTER(c_int64),
+    c_int64,
+)
+_econf_getUInt64ValueDef = _bind(
+    "econf_getUInt64ValueDef",
+    c_int,
+    c_void_p,
+    c_char_p,
+    c_char_p,
+    POINTER(c_uint64),
+    c_uint64,
+)
+_econf_getDoubleValueDef = _bind(
+    "econf_getDoubleValueDef",
+    c_int,
+    c_void_p,
+    c_char_p,
+    c_char_p,
+    POINTER(c_double),
+    c_double,
+)
+_econf_getStringValueDef = _bind(
+    "econf_getStringValueDef",
+    c_int,
+    c_void_p,
+    c_char_p,
+    c_char_p,
+    POINTER(c_void_p),
+    c_char_p,
+)
+_econf_getBoolValueDef = _bind(
+    "econf_getBoolValueDef",
+    c_int,
+    c_void_p,
+    c_char_p,
+    c_char_p,
+    POINTER(c_bool),
+    c_bool,
+)
+_econf_setInt64Value = _bind(
+    "econf_setInt64Value", c_int, c_void_p, c_char_p, c_char_p, c_int64
+)
+_econf_setUInt64Value = _bind(
+    "econf_setUInt64Value", c_int, c_void_p, c_char_p, c_char_p, c_uint64
+)
+_econf_setDoubleValue = _bind(
+    "econf_setDoubleValue", c_int, c_void_p, c_char_p, c_char_p, c_double
+)
+_econf_setStringValue = _bind(
+    "econf_setStringValue", c_int, c_void_p, c_char_p, c_char_p, c_char_p
+)
+_econf_setBoolValue = _bind(
+    "econf_setBoolValue", c_int, c_void_p, c_char_p, c_char_p, c_char_p
+)
+_econf_errString = _bind("econf_errString", c_char_p, c_int)
+_econf_errLocation = _bind(
+    "econf_errLocation", None, POINTER(c_char_p), POINTER(c_uint64)
+)
+_econf_freeFile = _bind("econf_freeFile", None, c_void_p)
+_econf_freeArray = _bind("econf_freeArray", None, POINTER(c_char_p))
+# strings returned by the string getters are allocated by libeconf and have to be released with the
+# free of the C library, which is found through the dependencies of libeconf
+_free = _bind("free", None, c_void_p)
+_econf_set_conf_dirs = _bind("econf_set_conf_dirs", c_int, POINTER(c_char_p))
 
 
 @dataclass
-class EconfFile:
+class EconfFile(collections.abc.Mapping):
     """
     Class which points to the Key Value storage object
+
+    It can be used as a read-only mapping of group names to EconfGroup views, keys without a group are
+    found under None. Group and key lists and values are cached until the file is changed with one of
+    the set functions. Pickled objects are recreated as new keyfiles with the same content, the path
+    of the original file is not kept.
     """
 
     _ptr: c_void_p
+    _groups: list[str | None] | None = field(default=None, init=False, repr=False, compare=False)
+    _keys: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _locales: dict = field(default_factory=dict, init=False, repr=False, compare=False)
 
     def __del__(self):
         free_file(self)
 
+    def __bool__(self) -> bool:
+        return bool(self._ptr)
+
+    def __reduce__(self):
+        # the content is serialized since the pointer is only valid in this process
+        data = bytearray()
+        if self._ptr:
+            _pack_key_file(data, self, "pickle")
+        return _unpickle_key_file, (bytes(data),)
+
+    def __getitem__(self, group: str | None) -> "EconfGroup":
+        if group not in self._group_list():
+            raise KeyError(group)
+        return EconfGroup(self, group)
+
+    def __iter__(self) -> Iterator[str | None]:
+        return iter(self._group_list())
+
+    def __len__(self) -> int:
+        return len(self._group_list())
+
+    def __contains__(self, group: object) -> bool:
+        return group in self._group_list()
+
+    def _group_list(self) -> list[str | None]:
+        if self._groups is None:
+            groups = [None] if self._group_keys(None) else []
+            try:
+                groups.extend(get_groups(self))
+            except KeyError:
+                pass
+            self._groups = groups
+        return self._groups
+
+    def _group_keys(self, group: str | None) -> dict[str, str | None]:
+        # maps the keys of a group to their value or None if the value was not read yet
+        keys = self._keys.get(group)
+        if keys is None:
+            try:
+                keys = dict.fromkeys(get_keys(self, group))
+            except KeyError:
+                keys = {}
+            self._keys[group] = keys
+        return keys
+
+    def _invalidate(self) -> None:
+        self._groups = None
+        self._keys = {}
+        self._locales = {}
+
+    def _locale_index(self, group: str | None) -> dict[str, dict[str | None, str]]:
+        # maps the base name of every key of a group to its values by locale, None for the plain key
+        index = self._locales.get(group)
+        if index is None:
+            index = {}
+            for name in self._group_keys(group):
+                base, bracket, locale = name.rstrip().partition("[")
+                if bracket and locale.endswith("]"):
+                    base = base.rstrip()
+                    locale = locale[:-1].strip()
+                else:
+                    base = name
+                    locale = None
+                index.setdefault(base, {})[locale] = get_string_value(self, group, name)
+            self._locales[group] = index
+        return index
+
+    def snapshot(self) -> dict[str | None, dict[str, str]]:
+        """
+        Read the whole content of the keyfile into a nested dictionary
+
+        :return: dictionary as returned by to_dict
+        """
+        return to_dict(self)
+
+
+class EconfGroup(collections.abc.Mapping):
+    """
+    Read-only mapping of the keys of a single group to their string values
+
+    Values are read from libeconf on first access and cached in the EconfFile.
+    """
+
+    def __init__(self, ef: EconfFile, group: str | None):
+        self.ef = ef
+        self.name = group
+
+    def __repr__(self) -> str:
+        return f"EconfGroup({self.name!r})"
+
+    def __getitem__(self, key: str) -> str:
+        keys = self.ef._group_keys(self.name)
+        value = keys.get(key)
+        if value is None:
+            if key not in keys:
+                raise KeyError(key)
+            value = keys[key] = get_string_value(self.ef, self.name, key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ef._group_keys(self.name))
+
+    def __len__(self) -> int:
+        return len(self.ef._group_keys(self.name))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.ef._group_keys(self.name)
+
 
 class EconfError(Enum):
     SUCCESS = 0
@@ -75,6 +473,17 @@ ECONF_EXCEPTION = {
 }
 
 
+def _econf_exception(err: EconfError, message: str) -> Exception:
+    # the exception keeps its EconfError, so the statistics can count errors by their code
+    exception = ECONF_EXCEPTION[err](message)
+    exception._econf_error = err
+    return exception
+
+
+# directory postfixes passed to set_conf_dirs, needed to know which drop-in directories are read
+_CONF_DIRS = []
+
+
 def _encode_str(string: str | bytes) -> bytes:
     if isinstance(string, str):
         string = string.encode("utf-8")
@@ -83,6 +492,25 @@ def _encode_str(string: str | bytes) -> bytes:
     return string
 
 
+def _take_string_array(c_array: POINTER(c_char_p), length: int) -> list[bytes]:
+    # copy the strings out of a char** returned by libeconf and release the native array
+    try:
+        return c_array[:length]
+    finally:
+        _econf_freeArray(c_array)
+
+
+def _take_string(c_value: c_void_p) -> bytes:
+    # copy a string returned by the string getters of libeconf and release the native string
+    if not c_value:
+        return b""
+    try:
+        return string_at(c_value)
+    finally:
+        _free(c_value)
+        c_value.value = None
+
+
 def _ensure_valid_char(char: str | bytes) -> bytes:
     char = _encode_str(char)
     if len(char) > 1:
@@ -126,7 +554,9 @@ def set_value(
     :param value: desired value
     :return: Nothing
     """
-    if isinstance(value, int):
+    if isinstance(value, bool):
+        set_bool_value(ef, group, key, value)
+    elif isinstance(value, int):
         if value >= 0:
             set_uint_value(ef, group, key, value)
         else:
@@ -135,10 +565,48 @@ def set_value(
         set_float_value(ef, group, key, value)
     elif isinstance(value, str) | isinstance(value, bytes):
         set_string_value(ef, group, key, value)
-    elif isinstance(value, bool):
-        set_bool_value(ef, group, key, value)
     else:
-        raise TypeError(f"parameter {val} is not one of the supported types")
+        raise TypeError(f"parameter {value} is not one of the supported types")
+
+
+def set_values(
+    ef: EconfFile, values: Mapping[str | bytes | None, Mapping[str | bytes, int | float | str | bool]]
+) -> None:
+    """
+    Set many values of a keyfile at once
+
+    The type of every value is checked and all groups, keys and values are encoded before the first
+    value is set, so an invalid value leaves the keyfile unchanged.
+
+    :param ef: EconfFile object to set values in
+    :param values: dictionary mapping groups (or None for no group) to dictionaries of keys and values
+    :return: Nothing
+    """
+    updates = []
+    for group, group_values in values.items():
+        c_group = _encode_str(group) if group else None
+        for key, value in group_values.items():
+            c_key = _encode_str(key)
+            if isinstance(value, bool):
+                updates.append((_econf_setBoolValue, c_group, c_key, _encode_str(str(value))))
+            elif isinstance(value, int):
+                if value >= 0:
+                    updates.append((_econf_setUInt64Value, c_group, c_key, _ensure_valid_uint(value)))
+                else:
+                    updates.append((_econf_setInt64Value, c_group, c_key, _ensure_valid_int(value)))
+            elif isinstance(value, float):
+                updates.append((_econf_setDoubleValue, c_group, c_key, c_double(value)))
+            elif isinstance(value, (str, bytes)):
+                updates.append((_econf_setStringValue, c_group, c_key, _encode_str(value)))
+            else:
+                raise TypeError(f"parameter {value} is not one of the supported types")
+    try:
+        for func, c_group, c_key, c_value in updates:
+            err = func(ef._ptr, c_group, c_key, c_value)
+            if err:
+                raise _econf_exception(EconfError(err), f"set_values failed with error: {err_string(err)}")
+    finally:
+        ef._invalidate()
 
 
 def read_file(
@@ -156,9 +624,9 @@ def read_file(
     file_name = _encode_str(file_name)
     delim = _ensure_valid_char(delim)
     comment = _ensure_valid_char(comment)
-    err = LIBECONF.econf_readFile(byref(result._ptr), file_name, delim, comment)
+    err = _econf_readFile(byref(result._ptr), file_name, delim, comment)
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"read_file failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"read_file failed with error: {err_string(err)}")
     return result
 
 
@@ -173,7 +641,8 @@ def read_file_with_callback(
     Read a config file and write the key-value pairs into a keyfile object
 
     A user defined function will be called in order e.g. to check the correct file permissions.
-    If the function returns False the parsing will be aborted and an Exception will be raised
+    If the function returns False the parsing will be aborted and an Exception will be raised,
+    exceptions raised by the function are passed on to the caller
 
     :param file_name: absolute path of file to be parsed
     :param delim: delimiter of a key/value e.g. '='
@@ -186,23 +655,84 @@ def read_file_with_callback(
     file_name = _encode_str(file_name)
     delim = _ensure_valid_char(delim)
     comment = _ensure_valid_char(comment)
-
-    def callback_proxy(fake_data: c_void_p) -> c_bool:
-        return callback(callback_data)
-
-    CBFUNC = CFUNCTYPE(c_bool, c_void_p)
-    cb_func = CBFUNC(callback_proxy)
-
-    err = LIBECONF.econf_readFileWithCallback(
-        byref(result._ptr), file_name, delim, comment, cb_func, c_void_p(None)
+    err = _call_with_callback(
+        _econf_readFileWithCallback, callback, callback_data, byref(result._ptr), file_name, delim, comment
     )
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](
-            f"read_file_with_callback failed with error: {err_string(err)}"
+        raise _econf_exception(
+            EconfError(err), f"read_file_with_callback failed with error: {err_string(err)}"
         )
     return result
 
 
+def parse_file(
+    file_name: str | bytes, delim: str | bytes, comment: str | bytes
+) -> dict[str | None, dict[str, str]]:
+    """
+    Parse a config file in pure Python without creating a keyfile object
+
+    Groups, keys and values are returned in the same form as to_dict would return them for the keyfile
+    read by read_file. This avoids the overhead of libeconf for small files and works without libeconf.
+
+    :param file_name: path of file to be parsed
+    :param delim: delimiter of a key/value e.g. '='
+    :param comment: string that defines the start of a comment e.g. '#'
+    :return: dictionary mapping each group to a dictionary of its keys and values
+    """
+    with open(_encode_str(file_name), "rb") as f:
+        data = f.read()
+    return parse_bytes(data, delim, comment)
+
+
+def parse_bytes(
+    data: bytes, delim: str | bytes, comment: str | bytes
+) -> dict[str | None, dict[str, str]]:
+    """
+    Parse the content of a config file in pure Python without creating a keyfile object
+
+    :param data: content of a config file
+    :param delim: delimiter of a key/value e.g. '='
+    :param comment: string that defines the start of a comment e.g. '#'
+    :return: dictionary mapping each group to a dictionary of its keys and values
+    """
+    delim = _ensure_valid_char(delim)
+    comment = _ensure_valid_char(comment)
+    if not delim:
+        raise ValueError("The delimiter must not be empty")
+    result = {}
+    group = None
+    for line_nr, line in enumerate(data.splitlines(), 1):
+        if comment:
+            line = line.split(comment, 1)[0]
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(b"["):
+            end = line.find(b"]")
+            if end < 0:
+                _raise_parse_error(EconfError.MISSING_BRACKET, line_nr)
+            if line[end + 1 :].strip():
+                _raise_parse_error(EconfError.TEXT_AFTER_SECTION, line_nr)
+            if end == 1:
+                _raise_parse_error(EconfError.EMPTY_SECTION_NAME, line_nr)
+            group = line[1:end].decode("utf-8")
+            result.setdefault(group, {})
+            continue
+        key, found, value = line.partition(delim)
+        if not found:
+            _raise_parse_error(EconfError.MISSING_DELIMITER, line_nr)
+        key = key.rstrip()
+        if not key:
+            _raise_parse_error(EconfError.EMPTYKEY, line_nr)
+        result.setdefault(group, {})[key.decode("utf-8")] = value.strip().decode("utf-8")
+    return result
+
+
+def _raise_parse_error(err: EconfError, line_nr: int) -> NoReturn:
+    message = err.name.lower().replace("_", " ")
+    raise _econf_exception(err, f"parse_bytes failed with error: {message} in line {line_nr}")
+
+
 def merge_files(usr_file: EconfFile, etc_file: EconfFile) -> EconfFile:
     """
     Merge the content of 2 keyfile objects
@@ -212,13 +742,13 @@ def merge_files(usr_file: EconfFile, etc_file: EconfFile) -> EconfFile:
     :return: merged EconfFile object
     """
     merged_file = EconfFile(c_void_p())
-    err = LIBECONF.econf_mergeFiles(
+    err = _econf_mergeFiles(
         byref(merged_file._ptr),
         usr_file._ptr,
         etc_file._ptr,
     )
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"merge_files failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"merge_files failed with error: {err_string(err)}")
     return merged_file
 
 
@@ -229,6 +759,8 @@ def read_dirs(
     config_suffix: str | bytes,
     delim: str | bytes,
     comment: str | bytes,
+    cache: str | bytes | None = None,
+    security: "SecurityPolicy | None" = None,
 ) -> EconfFile:
     """
     Read configuration from the first found config file and merge with snippets from conf.d/ directory
@@ -236,12 +768,18 @@ def read_dirs(
     e.g. searches /usr/etc/ and /etc/ for an example.conf file and merges it with the snippets in either
     /usr/etc/example.conf.d/ or /etc/example.conf.d
 
+    If a cache file is given the merged configuration is taken from it as long as none of the config
+    files changed, otherwise the files are read and the cache file is written again (see compile_cache).
+    With a SecurityPolicy all files and directories are checked before anything is read.
+
     :param usr_conf_dir: absolute path of the first directory to be searched
     :param etc_conf_dir: absolute path of the second directory to be searched
     :param project_name: basename of the configuration file
     :param config_suffix: suffix of the configuration file
     :param delim: delimiter of a key/value e.g. '='
     :param comment: string that defines the start of a comment e.g. '#'
+    :param cache: optional path of a cache file
+    :param security: optional requirements for owner and permissions of the files
     :return: merged EconfFile object
     """
     result = EconfFile(c_void_p())
@@ -251,7 +789,22 @@ def read_dirs(
     config_suffix = _encode_str(config_suffix)
     delim = _ensure_valid_char(delim)
     comment = _ensure_valid_char(comment)
-    err = LIBECONF.econf_readDirs(
+    args = (usr_conf_dir, etc_conf_dir, project_name, config_suffix, delim, comment)
+    if security is not None:
+        security._check_dirs(args)
+    if cache is not None:
+        cached = _load_cache(_encode_str(cache), args)
+        if cached is not None:
+            return cached
+        signature = LayeredConfig(*args)._scan()
+        result = read_dirs(*args)
+        try:
+            _write_cache(_encode_str(cache), args, signature, result)
+        except OSError:
+            # the cache is only an optimization, its directory might not be writable for this user
+            pass
+        return result
+    err = _econf_readDirs(
         byref(result._ptr),
         usr_conf_dir,
         etc_conf_dir,
@@ -261,7 +814,7 @@ def read_dirs(
         comment,
     )
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"read_dirs failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"read_dirs failed with error: {err_string(err)}")
     return result
 
 
@@ -279,7 +832,8 @@ def read_dirs_with_callback(
     Read configuration from the first found config file and merge with snippets from conf.d/ directory
 
     For every file a user defined function will be called in order e.g. to check the correct file permissions.
-    If the function returns False the parsing will be aborted and an Exception will be raised
+    If the function returns False the parsing will be aborted and an Exception will be raised,
+    exceptions raised by the function are passed on to the caller
 
     e.g. searches /usr/etc/ and /etc/ for an example.conf file and merges it with the snippets in either
     /usr/etc/example.conf.d/ or /etc/example.conf.d
@@ -301,14 +855,10 @@ def read_dirs_with_callback(
     config_suffix = _encode_str(config_suffix)
     delim = _ensure_valid_char(delim)
     comment = _ensure_valid_char(comment)
-
-    def callback_proxy(fake_data: c_void_p):
-        return callback(callback_data)
-
-    CBFUNC = CFUNCTYPE(c_bool, c_void_p)
-    cb_func = CBFUNC(callback_proxy)
-
-    err = LIBECONF.econf_readDirsWithCallback(
+    err = _call_with_callback(
+        _econf_readDirsWithCallback,
+        callback,
+        callback_data,
         byref(result._ptr),
         usr_conf_dir,
         etc_conf_dir,
@@ -316,12 +866,10 @@ def read_dirs_with_callback(
         config_suffix,
         delim,
         comment,
-        cb_func,
-        c_void_p(None),
     )
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](
-            f"read_dirs_with_callback failed with error: {err_string(err)}"
+        raise _econf_exception(
+            EconfError(err), f"read_dirs_with_callback failed with error: {err_string(err)}"
         )
     return result
 
@@ -356,7 +904,7 @@ def read_dirs_history(
     config_suffix = _encode_str(config_suffix)
     delim = _ensure_valid_char(delim)
     comment = _ensure_valid_char(comment)
-    err = LIBECONF.econf_readDirsHistory(
+    err = _econf_readDirsHistory(
         byref(key_files),
         byref(size),
         usr_conf_dir,
@@ -367,7 +915,7 @@ def read_dirs_history(
         comment,
     )
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"read_dirs_history failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"read_dirs_history failed with error: {err_string(err)}")
 
     arr = cast(key_files, POINTER(c_void_p * size.value))
     result = [EconfFile(c_void_p(i)) for i in arr.contents]
@@ -388,7 +936,8 @@ def read_dirs_history_with_callback(
     Read configuration from the first found config file and snippets from conf.d/ directory
 
     For every file a user defined function will be called in order e.g. to check the correct file permissions.
-    If the function returns False the parsing will be aborted and an Exception will be raised
+    If the function returns False the parsing will be aborted and an Exception will be raised,
+    exceptions raised by the function are passed on to the caller
 
     e.g. searches /usr/etc/ and /etc/ for an example.conf file and the snippets in either
     /usr/etc/example.conf.d/ or /etc/example.conf.d
@@ -411,14 +960,10 @@ def read_dirs_history_with_callback(
     config_suffix = _encode_str(config_suffix)
     delim = _ensure_valid_char(delim)
     comment = _ensure_valid_char(comment)
-
-    def callback_proxy(fake_data: c_void_p):
-        return callback(callback_data)
-
-    CBFUNC = CFUNCTYPE(c_bool, c_void_p)
-    cb_func = CBFUNC(callback_proxy)
-
-    err = LIBECONF.econf_readDirsHistoryWithCallback(
+    err = _call_with_callback(
+        _econf_readDirsHistoryWithCallback,
+        callback,
+        callback_data,
         byref(key_files),
         byref(size),
         usr_conf_dir,
@@ -427,12 +972,10 @@ def read_dirs_history_with_callback(
         config_suffix,
         delim,
         comment,
-        cb_func,
-        c_void_p(None),
     )
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](
-            f"read_dirs_history_with_callback failed with error: {err_string(err)}"
+        raise _econf_exception(
+            EconfError(err), f"read_dirs_history_with_callback failed with error: {err_string(err)}"
         )
 
     arr = cast(key_files, POINTER(c_void_p * size.value))
@@ -451,9 +994,9 @@ def new_key_file(delim: str | bytes, comment: str | bytes) -> EconfFile:
     result = EconfFile(c_void_p())
     delim = c_char(_ensure_valid_char(delim))
     comment = c_char(_ensure_valid_char(comment))
-    err = LIBECONF.econf_newKeyFile(byref(result._ptr), delim, comment)
+    err = _econf_newKeyFile(byref(result._ptr), delim, comment)
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"new_key_file failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"new_key_file failed with error: {err_string(err)}")
     return result
 
 
@@ -464,9 +1007,9 @@ def new_ini_file() -> EconfFile:
     :return: created EconfFile object
     """
     result = EconfFile(c_void_p())
-    err = LIBECONF.econf_newIniFile(byref(result._ptr))
+    err = _econf_newIniFile(byref(result._ptr))
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"new_ini_file failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"new_ini_file failed with error: {err_string(err)}")
     return result
 
 
@@ -477,8 +1020,7 @@ def comment_tag(ef: EconfFile) -> str:
     :param ef: Key-Value storage object
     :return: The comment tag of the EconfFile
     """
-    LIBECONF.econf_comment_tag.restype = c_char
-    result = LIBECONF.econf_comment_tag(ef._ptr)
+    result = _econf_comment_tag(ef._ptr)
     return result.decode("utf-8")
 
 
@@ -489,8 +1031,7 @@ def delimiter_tag(ef: EconfFile) -> str:
     :param ef: Key-Value storage object
     :return: the delimiter tag of the EconfFile
     """
-    LIBECONF.econf_delimiter_tag.restype = c_char
-    result = LIBECONF.econf_delimiter_tag(ef._ptr)
+    result = _econf_delimiter_tag(ef._ptr)
     return result.decode("utf-8")
 
 
@@ -504,7 +1045,7 @@ def set_comment_tag(ef: EconfFile, comment: str | bytes) -> None:
     """
     comment = _ensure_valid_char(comment)
     c_comment = c_char(comment)
-    LIBECONF.econf_set_comment_tag(ef._ptr, c_comment)
+    _econf_set_comment_tag(ef._ptr, c_comment)
 
 
 def set_delimiter_tag(ef: EconfFile, delimiter: str | bytes) -> None:
@@ -517,23 +1058,173 @@ def set_delimiter_tag(ef: EconfFile, delimiter: str | bytes) -> None:
     """
     delimiter = _ensure_valid_char(delimiter)
     c_delimiter = c_char(delimiter)
-    LIBECONF.econf_set_delimiter_tag(ef._ptr, c_delimiter)
+    _econf_set_delimiter_tag(ef._ptr, c_delimiter)
 
 
-def write_file(ef: EconfFile, save_to_dir: str, file_name: str) -> None:
+def write_file(
+    ef: EconfFile,
+    save_to_dir: str,
+    file_name: str,
+    atomic: bool = False,
+    fsync: bool = False,
+    only_if_changed: bool = False,
+) -> bool:
     """
     Write content of a keyfile to specified location
 
+    With atomic the content is written to a temporary file in the same directory which then replaces
+    the old file, so readers never see a partially written file. The permissions of the old file are
+    kept. With only_if_changed the file is not touched at all if it already has the same content.
+
     :param ef: Key-Value storage object
     :param save_to_dir: directory into which the file has to be written
     :param file_name: filename with suffix of the to be written file
-    :return: Nothing
+    :param atomic: replace the file atomically
+    :param fsync: flush the file (and the directory for atomic writes) to disk before returning
+    :param only_if_changed: skip writing if the file content would not change
+    :return: True if the file was written, False if it was already up to date
     """
     c_save_to_dir = _encode_str(save_to_dir)
     c_file_name = _encode_str(file_name)
-    err = LIBECONF.econf_writeFile(byref(ef._ptr), c_save_to_dir, c_file_name)
+    target = os.path.join(c_save_to_dir, c_file_name)
+    if not (atomic or only_if_changed):
+        _write_key_file(ef, c_save_to_dir, c_file_name)
+        if fsync:
+            _fsync_path(target)
+        return True
+    tmp_name = b".%s.%s.tmp" % (c_file_name, os.urandom(6).hex().encode())
+    tmp_path = os.path.join(c_save_to_dir, tmp_name)
+    try:
+        _write_key_file(ef, c_save_to_dir, tmp_name)
+        with open(tmp_path, "rb") as f:
+            content = f.read()
+        if only_if_changed and _has_content(target, content):
+            return False
+        if atomic:
+            try:
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(target).st_mode))
+            except FileNotFoundError:
+                pass
+            if fsync:
+                _fsync_path(tmp_path)
+            os.replace(tmp_path, target)
+            if fsync:
+                _fsync_path(c_save_to_dir)
+        else:
+            with open(target, "wb") as f:
+                f.write(content)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        return True
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_key_file(ef: EconfFile, c_save_to_dir: bytes, c_file_name: bytes) -> None:
+    err = _econf_writeFile(ef._ptr, c_save_to_dir, c_file_name)
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"write_file failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"write_file failed with error: {err_string(err)}")
+
+
+def _has_content(path: bytes, content: bytes) -> bool:
+    # comparing the sizes first avoids reading the old file in most cases where it changed
+    try:
+        if os.stat(path).st_size != len(content):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == content
+    except FileNotFoundError:
+        return False
+
+
+def _fsync_path(path: bytes) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def dumps(ef: EconfFile) -> bytes:
+    """
+    Serialize the content of a keyfile into the config file format without writing it to disk
+
+    Keys without a group come first, followed by one section per group. Keys and values are separated
+    by the delimiter tag of the keyfile.
+
+    :param ef: Key-Value storage object
+    :return: content of the config file
+    """
+    delim = delimiter_tag(ef)
+    lines = []
+    for group, values in to_dict(ef).items():
+        if group is not None:
+            if lines:
+                lines.append("")
+            lines.append(f"[{group}]")
+        lines.extend(f"{key}{delim}{value}" for key, value in values.items())
+    if not lines:
+        return b""
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def dump(ef: EconfFile, fileobj: BinaryIO) -> None:
+    """
+    Serialize the content of a keyfile into a binary file object
+
+    :param ef: Key-Value storage object
+    :param fileobj: file object opened in binary mode
+    :return: Nothing
+    """
+    fileobj.write(dumps(ef))
+
+
+def loads(data: bytes, delim: str | bytes, comment: str | bytes) -> EconfFile:
+    """
+    Parse the content of a config file from memory into a keyfile object
+
+    On Linux the data is handed to libeconf through an anonymous memory file, elsewhere through a
+    temporary file.
+
+    :param data: content of a config file
+    :param delim: delimiter of a key/value e.g. '='
+    :param comment: string that defines the start of a comment e.g. '#'
+    :return: Key-Value storage object
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if hasattr(os, "memfd_create"):
+        fd = os.memfd_create("econf", os.MFD_CLOEXEC)
+        try:
+            _write_all(fd, data)
+            return read_file(f"/proc/self/fd/{fd}", delim, comment)
+        except PermissionError:
+            # libeconf may be configured to reject /proc/self/fd/ since it is a symbolic link
+            pass
+        finally:
+            os.close(fd)
+    import tempfile
+
+    fd, path = tempfile.mkstemp(suffix=".conf")
+    try:
+        _write_all(fd, data)
+        os.close(fd)
+        fd = -1
+        return read_file(path, delim, comment)
+    finally:
+        if fd >= 0:
+            os.close(fd)
+        os.unlink(path)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
 
 
 def get_path(ef: EconfFile) -> str:
@@ -544,8 +1235,7 @@ def get_path(ef: EconfFile) -> str:
     :return: path of the config file as string
     """
     # extract from pointer
-    LIBECONF.econf_getPath.restype = c_char_p
-    return LIBECONF.econf_getPath(ef._ptr).decode("utf-8")
+    return _econf_getPath(ef._ptr).decode("utf-8")
 
 
 def get_groups(ef: EconfFile) -> list[str]:
@@ -556,12 +1246,11 @@ def get_groups(ef: EconfFile) -> list[str]:
     :return: list of groups in the keyfile
     """
     c_length = c_size_t()
-    c_groups = c_void_p(None)
-    err = LIBECONF.econf_getGroups(ef._ptr, byref(c_length), byref(c_groups))
+    c_groups = POINTER(c_char_p)()
+    err = _econf_getGroups(ef._ptr, byref(c_length), byref(c_groups))
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_groups failed with error: {err_string(err)}")
-    arr = cast(c_groups, POINTER(c_char_p * c_length.value))
-    result = [i.decode("utf-8") for i in arr.contents]
+        raise _econf_exception(EconfError(err), f"get_groups failed with error: {err_string(err)}")
+    result = [i.decode("utf-8") for i in _take_string_array(c_groups, c_length.value)]
     return result
 
 
@@ -569,22 +1258,95 @@ def get_keys(ef: EconfFile, group: str) -> list[str]:
     """
     List all the keys of a given group or all keys in a keyfile
 
+    :param ef: Key-Value storage object
+    :param group: group of the keys to be returned or None for keys without a group
+    :return: list of keys in the given group
+    """
+    result = [i.decode("utf-8") for i in get_keys_bytes(ef, group)]
+    return result
+
+
+def get_keys_bytes(ef: EconfFile, group: str | bytes) -> list[bytes]:
+    """
+    List all the keys of a given group as raw bytes without decoding them
+
     :param ef: Key-Value storage object
     :param group: group of the keys to be returned or None for keys without a group
     :return: list of keys in the given group
     """
     c_length = c_size_t()
-    c_keys = c_void_p(None)
+    c_keys = POINTER(c_char_p)()
     if group:
         group = _encode_str(group)
-    err = LIBECONF.econf_getKeys(ef._ptr, group, byref(c_length), byref(c_keys))
+    err = _econf_getKeys(ef._ptr, group, byref(c_length), byref(c_keys))
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_keys failed with error: {err_string(err)}")
-    arr = cast(c_keys, POINTER(c_char_p * c_length.value))
-    result = [i.decode("utf-8") for i in arr.contents]
+        raise _econf_exception(EconfError(err), f"get_keys failed with error: {err_string(err)}")
+    return _take_string_array(c_keys, c_length.value)
+
+
+def _iter_group_keys(ef: EconfFile, caller: str) -> Iterator[Tuple[bytes | None, list[bytes]]]:
+    # yields every group name, None first, with its keys while only one key array is held at a time
+    c_length = c_size_t()
+    c_array = POINTER(c_char_p)()
+    c_groups = [None]
+    err = _econf_getGroups(ef._ptr, byref(c_length), byref(c_array))
+    if err and EconfError(err) != EconfError.NOGROUP:
+        raise _econf_exception(EconfError(err), f"{caller} failed with error: {err_string(err)}")
+    if not err:
+        c_groups.extend(_take_string_array(c_array, c_length.value))
+    for c_group in c_groups:
+        err = _econf_getKeys(ef._ptr, c_group, byref(c_length), byref(c_array))
+        if err and EconfError(err) != EconfError.NOKEY:
+            raise _econf_exception(EconfError(err), f"{caller} failed with error: {err_string(err)}")
+        yield c_group, [] if err else _take_string_array(c_array, c_length.value)
+
+
+def to_dict(ef: EconfFile) -> dict[str | None, dict[str, str]]:
+    """
+    Read all groups, keys and values of a keyfile into a nested dictionary in one pass
+
+    Keys without a group are stored under None. All values are returned as strings.
+
+    :param ef: Key-Value storage object
+    :return: dictionary mapping each group to a dictionary of its keys and values
+    """
+    c_value = c_void_p()
+    result = {}
+    for c_group, c_keys in _iter_group_keys(ef, "to_dict"):
+        values = {}
+        for c_key in c_keys:
+            err = _econf_getStringValue(ef._ptr, c_group, c_key, byref(c_value))
+            if err:
+                raise _econf_exception(EconfError(err), f"to_dict failed with error: {err_string(err)}")
+            values[c_key.decode("utf-8")] = _take_string(c_value).decode("utf-8")
+        if c_group is None:
+            if values:
+                result[None] = values
+        else:
+            result[c_group.decode("utf-8")] = values
     return result
 
 
+def iter_items(ef: EconfFile) -> Iterator[Tuple[str | None, str, str]]:
+    """
+    Lazily iterate over all groups, keys and values of a keyfile
+
+    The keys are fetched one group at a time, so memory usage only depends on the size of the largest
+    group. Keys without a group come first with None as group.
+
+    :param ef: Key-Value storage object
+    :return: iterator of (group, key, value) tuples with the values as strings
+    """
+    c_value = c_void_p()
+    for c_group, c_keys in _iter_group_keys(ef, "iter_items"):
+        group = None if c_group is None else c_group.decode("utf-8")
+        for c_key in c_keys:
+            err = _econf_getStringValue(ef._ptr, c_group, c_key, byref(c_value))
+            if err:
+                raise _econf_exception(EconfError(err), f"iter_items failed with error: {err_string(err)}")
+            yield group, c_key.decode("utf-8"), _take_string(c_value).decode("utf-8")
+
+
 def get_int_value(ef: EconfFile, group: str, key: str) -> int:
     """
     Return an integer value for given group/key
@@ -598,9 +1360,9 @@ def get_int_value(ef: EconfFile, group: str, key: str) -> int:
         group = _encode_str(group)
     c_key = _encode_str(key)
     c_result = c_int64()
-    err = LIBECONF.econf_getInt64Value(ef._ptr, group, c_key, byref(c_result))
+    err = _econf_getInt64Value(ef._ptr, group, c_key, byref(c_result))
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_int64_value failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"get_int64_value failed with error: {err_string(err)}")
     return c_result.value
 
 
@@ -617,9 +1379,9 @@ def get_uint_value(ef: EconfFile, group: str, key: str) -> int:
         group = _encode_str(group)
     c_key = _encode_str(key)
     c_result = c_uint64()
-    err = LIBECONF.econf_getUInt64Value(ef._ptr, group, c_key, byref(c_result))
+    err = _econf_getUInt64Value(ef._ptr, group, c_key, byref(c_result))
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_uint64_value failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"get_uint64_value failed with error: {err_string(err)}")
     return c_result.value
 
 
@@ -636,9 +1398,9 @@ def get_float_value(ef: EconfFile, group: str, key: str) -> float:
         group = _encode_str(group)
     c_key = _encode_str(key)
     c_result = c_double()
-    err = LIBECONF.econf_getDoubleValue(ef._ptr, group, c_key, byref(c_result))
+    err = _econf_getDoubleValue(ef._ptr, group, c_key, byref(c_result))
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_double_value failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"get_double_value failed with error: {err_string(err)}")
     return c_result.value
 
 
@@ -654,11 +1416,11 @@ def get_string_value(ef: EconfFile, group: str, key: str) -> str:
     if group:
         group = _encode_str(group)
     c_key = _encode_str(key)
-    c_result = c_char_p()
-    err = LIBECONF.econf_getStringValue(ef._ptr, group, c_key, byref(c_result))
+    c_result = c_void_p()
+    err = _econf_getStringValue(ef._ptr, group, c_key, byref(c_result))
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_string_value failed with error: {err_string(err)}")
-    return c_result.value.decode("utf-8")
+        raise _econf_exception(EconfError(err), f"get_string_value failed with error: {err_string(err)}")
+    return _take_string(c_result).decode("utf-8")
 
 
 def get_bool_value(ef: EconfFile, group: str, key: str) -> bool:
@@ -674,12 +1436,186 @@ def get_bool_value(ef: EconfFile, group: str, key: str) -> bool:
         group = _encode_str(group)
     c_key = _encode_str(key)
     c_result = c_bool()
-    err = LIBECONF.econf_getBoolValue(ef._ptr, group, c_key, byref(c_result))
+    err = _econf_getBoolValue(ef._ptr, group, c_key, byref(c_result))
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_bool_value failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"get_bool_value failed with error: {err_string(err)}")
     return c_result.value
 
 
+# values accepted in boolean lists, like the values accepted by econf_getBoolValue
+_BOOL_VALUES = {b"1": True, b"yes": True, b"true": True, b"0": False, b"no": False, b"false": False}
+_LIST_CONTAINERS = ("list", "array", "numpy")
+
+
+def get_int_list(
+    ef: EconfFile, group: str, key: str, separator: str | bytes = ";", container: str = "list"
+) -> list[int] | array.array:
+    """
+    Return a list of integers stored in a single value, e.g. Numbers=2;20;-200
+
+    The value is read with one call into libeconf and converted without decoding it first. For long
+    lists an array.array('q') or a NumPy int64 array can be returned instead of a list.
+
+    :param ef: Key-Value storage object
+    :param group: desired group
+    :param key: key of the value that is requested
+    :param separator: string between the single values
+    :param container: "list", "array" or "numpy"
+    :return: values of the key
+    """
+    return _get_list(ef, group, key, separator, container, int, "q", "int64", "get_int_list")
+
+
+def get_float_list(
+    ef: EconfFile, group: str, key: str, separator: str | bytes = ";", container: str = "list"
+) -> list[float] | array.array:
+    """
+    Return a list of floats stored in a single value, e.g. Factors=0.5;1.5
+
+    For long lists an array.array('d') or a NumPy float64 array can be returned instead of a list.
+
+    :param ef: Key-Value storage object
+    :param group: desired group
+    :param key: key of the value that is requested
+    :param separator: string between the single values
+    :param container: "list", "array" or "numpy"
+    :return: values of the key
+    """
+    return _get_list(ef, group, key, separator, container, float, "d", "float64", "get_float_list")
+
+
+def get_bool_list(
+    ef: EconfFile, group: str, key: str, separator: str | bytes = ";", container: str = "list"
+) -> list[bool] | array.array:
+    """
+    Return a list of booleans stored in a single value, e.g. Booleans=true;false
+
+    The single values may be true/false, yes/no or 1/0 in any case. For long lists an array.array('b')
+    or a NumPy bool array can be returned instead of a list.
+
+    :param ef: Key-Value storage object
+    :param group: desired group
+    :param key: key of the value that is requested
+    :param separator: string between the single values
+    :param container: "list", "array" or "numpy"
+    :return: values of the key
+    """
+    return _get_list(ef, group, key, separator, container, _parse_bool, "b", "bool", "get_bool_list")
+
+
+def get_string_list(ef: EconfFile, group: str, key: str, separator: str | bytes = ";") -> list[str]:
+    """
+    Return a list of strings stored in a single value, e.g. Names=foo;bar
+
+    :param ef: Key-Value storage object
+    :param group: desired group
+    :param key: key of the value that is requested
+    :param separator: string between the single values
+    :return: values of the key
+    """
+    value = _get_raw_string(ef, group, key, "get_string_list")
+    if not value:
+        return []
+    return value.decode("utf-8").split(_encode_str(separator).decode("utf-8"))
+
+
+def get_localized_string(ef: EconfFile, group: str | None, key: str, locale: str) -> str:
+    """
+    Return the string value of a key for the given locale, e.g. Welcome[fr_FR] for fr_FR.UTF-8
+
+    The locale is matched as lang_COUNTRY@MODIFIER, lang_COUNTRY, lang@MODIFIER and lang, the encoding
+    is ignored. If none of them exists the value of the key without locale is returned. All localized
+    values of a group are read on the first lookup and kept until the keyfile is changed with one of
+    the set functions.
+
+    :param ef: Key-Value storage object
+    :param group: desired group or None for keys without a group
+    :param key: key of the value without locale
+    :param locale: locale name, e.g. the value of LANG
+    :return: localized value of the key
+    """
+    if group not in ef:
+        raise _econf_exception(
+            EconfError.NOGROUP,
+            f"get_localized_string failed with error: {err_string(EconfError.NOGROUP.value)}",
+        )
+    values = ef._locale_index(group).get(key)
+    if values is not None:
+        for candidate in _locale_candidates(locale):
+            if candidate in values:
+                return values[candidate]
+    raise _econf_exception(
+        EconfError.NOKEY,
+        f"get_localized_string failed with error: {err_string(EconfError.NOKEY.value)}",
+    )
+
+
+@lru_cache(maxsize=64)
+def _locale_candidates(locale: str) -> Tuple[str | None, ...]:
+    # lang_COUNTRY.ENCODING@MODIFIER
+    name, _, modifier = locale.partition("@")
+    language, _, country = name.partition(".")[0].partition("_")
+    candidates = []
+    if country and modifier:
+        candidates.append(f"{language}_{country}@{modifier}")
+    if country:
+        candidates.append(f"{language}_{country}")
+    if modifier:
+        candidates.append(f"{language}@{modifier}")
+    if language:
+        candidates.append(language)
+    candidates.append(None)
+    return tuple(candidates)
+
+
+def _get_raw_string(ef: EconfFile, group: str | bytes | None, key: str | bytes, caller: str) -> bytes:
+    if group:
+        group = _encode_str(group)
+    c_key = _encode_str(key)
+    c_result = c_void_p()
+    err = _econf_getStringValue(ef._ptr, group, c_key, byref(c_result))
+    if err:
+        raise _econf_exception(EconfError(err), f"{caller} failed with error: {err_string(err)}")
+    return _take_string(c_result)
+
+
+def _get_list(
+    ef: EconfFile,
+    group: str | bytes | None,
+    key: str | bytes,
+    separator: str | bytes,
+    container: str,
+    convert: Callable[[bytes], Any],
+    typecode: str,
+    dtype: str,
+    caller: str,
+) -> Any:
+    if container not in _LIST_CONTAINERS:
+        raise ValueError(f"container must be one of {', '.join(_LIST_CONTAINERS)}")
+    separator = _encode_str(separator)
+    if not separator:
+        raise ValueError("separator must not be empty")
+    value = _get_raw_string(ef, group, key, caller)
+    parts = value.split(separator) if value.strip() else []
+    try:
+        if container == "list":
+            return list(map(convert, parts))
+        if container == "array":
+            return array.array(typecode, map(convert, parts))
+        import numpy
+
+        return numpy.fromiter(map(convert, parts), dtype=dtype, count=len(parts))
+    except ValueError as e:
+        raise ValueError(f"{caller} failed with error: {e}") from None
+
+
+def _parse_bool(value: bytes) -> bool:
+    try:
+        return _BOOL_VALUES[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f"{value!r} is not a boolean value") from None
+
+
 def get_int_value_def(ef: EconfFile, group: str, key: str, default: int) -> int:
     """
     Return an integer value for given group/key or return a default value if key is not found
@@ -695,11 +1631,11 @@ def get_int_value_def(ef: EconfFile, group: str, key: str, default: int) -> int:
     c_key = _encode_str(key)
     c_result = c_int64()
     c_default = _ensure_valid_int(default)
-    err = LIBECONF.econf_getInt64ValueDef(
+    err = _econf_getInt64ValueDef(
         ef._ptr, group, c_key, byref(c_result), c_default
     )
     if err and EconfError(err) != EconfError.NOKEY:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_int64_value_def failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"get_int64_value_def failed with error: {err_string(err)}")
     return c_result.value
 
 
@@ -718,11 +1654,11 @@ def get_uint_value_def(ef: EconfFile, group: str, key: str, default: int) -> int
     c_key = _encode_str(key)
     c_result = c_uint64()
     c_default = _ensure_valid_uint(default)
-    err = LIBECONF.econf_getUInt64ValueDef(
+    err = _econf_getUInt64ValueDef(
         ef._ptr, group, c_key, byref(c_result), c_default
     )
     if err and EconfError(err) != EconfError.NOKEY:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_uint64_value_def failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"get_uint64_value_def failed with error: {err_string(err)}")
     return c_result.value
 
 
@@ -743,11 +1679,11 @@ def get_float_value_def(ef: EconfFile, group: str, key: str, default: float) ->
     if not isinstance(default, float):
         raise TypeError('"default" parameter must be of type float')
     c_default = c_double(default)
-    err = LIBECONF.econf_getDoubleValueDef(
+    err = _econf_getDoubleValueDef(
         ef._ptr, group, c_key, byref(c_result), c_default
     )
     if err and EconfError(err) != EconfError.NOKEY:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_double_value_def failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"get_double_value_def failed with error: {err_string(err)}")
     return c_result.value
 
 
@@ -764,16 +1700,16 @@ def get_string_value_def(ef: EconfFile, group: str, key: str, default: str) -> s
     if group:
         group = _encode_str(group)
     c_key = _encode_str(key)
-    c_result = c_char_p()
+    c_result = c_void_p()
     c_default = _encode_str(default)
-    err = LIBECONF.econf_getStringValueDef(
+    err = _econf_getStringValueDef(
         ef._ptr, group, c_key, byref(c_result), c_default
     )
     if err:
         if EconfError(err) == EconfError.NOKEY:
             return c_default.decode("utf-8")
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_string_value_def failed with error: {err_string(err)}")
-    return c_result.value.decode("utf-8")
+        raise _econf_exception(EconfError(err), f"get_string_value_def failed with error: {err_string(err)}")
+    return _take_string(c_result).decode("utf-8")
 
 
 def get_bool_value_def(ef: EconfFile, group: str, key: str, default: bool) -> bool:
@@ -793,11 +1729,11 @@ def get_bool_value_def(ef: EconfFile, group: str, key: str, default: bool) -> bo
     if not isinstance(default, bool):
         raise TypeError('"value" parameter must be of type bool')
     c_default = c_bool(default)
-    err = LIBECONF.econf_getBoolValueDef(
+    err = _econf_getBoolValueDef(
         ef._ptr, group, c_key, byref(c_result), c_default
     )
     if err and EconfError(err) != EconfError.NOKEY:
-        raise ECONF_EXCEPTION[EconfError(err)](f"get_bool_value_def failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"get_bool_value_def failed with error: {err_string(err)}")
     return c_result.value
 
 
@@ -815,9 +1751,10 @@ def set_int_value(ef: EconfFile, group: str, key: str, value: int) -> None:
         group = _encode_str(group)
     c_key = _encode_str(key)
     c_value = _ensure_valid_int(value)
-    err = LIBECONF.econf_setInt64Value(ef._ptr, group, c_key, c_value)
+    err = _econf_setInt64Value(ef._ptr, group, c_key, c_value)
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"set_int64_value failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"set_int64_value failed with error: {err_string(err)}")
+    ef._invalidate()
 
 
 def set_uint_value(ef: EconfFile, group: str, key: str, value: int) -> None:
@@ -834,9 +1771,10 @@ def set_uint_value(ef: EconfFile, group: str, key: str, value: int) -> None:
         group = _encode_str(group)
     c_key = _encode_str(key)
     c_value = _ensure_valid_uint(value)
-    err = LIBECONF.econf_setUInt64Value(ef._ptr, group, c_key, c_value)
+    err = _econf_setUInt64Value(ef._ptr, group, c_key, c_value)
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"set_uint64_value failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"set_uint64_value failed with error: {err_string(err)}")
+    ef._invalidate()
 
 
 def set_float_value(ef: EconfFile, group: str, key: str, value: float) -> None:
@@ -855,9 +1793,10 @@ def set_float_value(ef: EconfFile, group: str, key: str, value: float) -> None:
     if not isinstance(value, float):
         raise TypeError('"value" parameter must be of type float')
     c_value = c_double(value)
-    err = LIBECONF.econf_setDoubleValue(ef._ptr, group, c_key, c_value)
+    err = _econf_setDoubleValue(ef._ptr, group, c_key, c_value)
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"set_double_value failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"set_double_value failed with error: {err_string(err)}")
+    ef._invalidate()
 
 
 def set_string_value(ef: EconfFile, group: str, key: str, value: str | bytes) -> None:
@@ -874,9 +1813,10 @@ def set_string_value(ef: EconfFile, group: str, key: str, value: str | bytes) ->
         group = _encode_str(group)
     c_key = _encode_str(key)
     c_value = _encode_str(value)
-    err = LIBECONF.econf_setStringValue(ef._ptr, group, c_key, c_value)
+    err = _econf_setStringValue(ef._ptr, group, c_key, c_value)
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"set_string_value failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"set_string_value failed with error: {err_string(err)}")
+    ef._invalidate()
 
 
 def set_bool_value(ef: EconfFile, group: str, key: str, value: bool) -> None:
@@ -895,9 +1835,10 @@ def set_bool_value(ef: EconfFile, group: str, key: str, value: bool) -> None:
     if not isinstance(value, bool):
         raise TypeError('"value" parameter must be of type bool')
     c_value = _encode_str(str(value))
-    err = LIBECONF.econf_setBoolValue(ef._ptr, group, c_key, c_value)
+    err = _econf_setBoolValue(ef._ptr, group, c_key, c_value)
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"set_bool_value failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"set_bool_value failed with error: {err_string(err)}")
+    ef._invalidate()
 
 
 def err_string(error: int) -> str:
@@ -909,9 +1850,7 @@ def err_string(error: int) -> str:
     """
     if not isinstance(error, int):
         raise TypeError("Error codes must be of type int")
-    c_int(error)
-    LIBECONF.econf_errString.restype = c_char_p
-    return LIBECONF.econf_errString(error).decode("utf-8")
+    return _econf_errString(error).decode("utf-8")
 
 
 def err_location() -> Tuple[str, int]:
@@ -922,7 +1861,7 @@ def err_location() -> Tuple[str, int]:
     """
     c_filename = c_char_p()
     c_line_nr = c_uint64()
-    LIBECONF.econf_errLocation(byref(c_filename), byref(c_line_nr))
+    _econf_errLocation(byref(c_filename), byref(c_line_nr))
     return c_filename.value.decode("utf-8"), c_line_nr.value
 
 
@@ -939,7 +1878,7 @@ def free_file(ef: EconfFile):
         raise TypeError("Parameter must be an EconfFile object")
     if not ef._ptr:
         return
-    LIBECONF.econf_freeFile(ef._ptr)
+    _econf_freeFile(ef._ptr)
 
 
 def set_conf_dirs(dir_postfix_list: list[str]) -> None:
@@ -963,6 +1902,1538 @@ def set_conf_dirs(dir_postfix_list: list[str]) -> None:
         if dir_postfix_list[i] is not None:
             dir_postfix_list[i] = _encode_str(dir_postfix_list[i])
         dir_arr[i] = c_char_p(dir_postfix_list[i])
-    err = LIBECONF.econf_set_conf_dirs(dir_arr)
+    err = _econf_set_conf_dirs(dir_arr)
     if err:
-        raise ECONF_EXCEPTION[EconfError(err)](f"set_conf_dirs failed with error: {err_string(err)}")
+        raise _econf_exception(EconfError(err), f"set_conf_dirs failed with error: {err_string(err)}")
+    global _CONF_DIRS
+    _CONF_DIRS = [i for i in dir_postfix_list if i is not None]
+
+
+def _stat_signature(path: str | bytes) -> Tuple[int, ...]:
+    # mode, owner and change time cover chmod and chown, which matter to permission checking callbacks,
+    # the mode and owner are compared as well since timestamps can be too coarse to notice a change
+    st = os.stat(path)
+    return (
+        st.st_mtime_ns,
+        st.st_ctime_ns,
+        st.st_size,
+        st.st_ino,
+        st.st_dev,
+        st.st_mode,
+        st.st_uid,
+        st.st_gid,
+    )
+
+
+def _try_stat_signature(path: str | bytes) -> Tuple[int, ...] | None:
+    try:
+        return _stat_signature(path)
+    except OSError:
+        return None
+
+
+@dataclass(frozen=True)
+class SecurityPolicy:
+    """
+    Requirements for the owner and permissions of the files read by read_dirs
+
+    The config file, the drop-in directories and the snippets in them are checked in one pass with a
+    single lstat call each before any file is parsed, a violation raises the PermissionError of the
+    matching EconfError. Files must not have any permission bit which is not part of max_mode. Files
+    replaced by a file of the same name in the etc directory are not read and so not checked.
+
+    :param owner: required user id of the owner
+    :param group: required group id
+    :param max_mode: permission bits which config files may have at most
+    :param max_dir_mode: permission bits which drop-in directories may have at most
+    :param allow_symlinks: whether config files may be symbolic links, links are checked by their target
+    """
+
+    owner: int | None = None
+    group: int | None = None
+    max_mode: int | None = None
+    max_dir_mode: int | None = None
+    allow_symlinks: bool = True
+
+    def _check_dirs(self, args: tuple) -> None:
+        # only files which libeconf reads are checked, the config file in the etc directory replaces
+        # the one in the usr directory and snippets replace those with the same name read before
+        files, dirs = LayeredConfig(*args)._candidates()
+        suffix = b"." + args[3] if args[3] else b""
+        for path in reversed(files):
+            if self._check(path, False):
+                break
+        snippets = {}
+        for path in dirs:
+            if not self._check(path, True):
+                continue
+            try:
+                entries = os.listdir(path)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.endswith(suffix):
+                    snippets[entry] = os.path.join(path, entry)
+        for path in snippets.values():
+            self._check(path, False)
+
+    def _check(self, path: bytes, is_dir: bool) -> bool:
+        # returns False if the path does not exist
+        try:
+            st = os.lstat(path)
+            if stat.S_ISLNK(st.st_mode):
+                if not self.allow_symlinks:
+                    _raise_security_error(EconfError.ERROR_FILE_IS_SYM_LINK, path)
+                st = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if self.owner is not None and st.st_uid != self.owner:
+            _raise_security_error(EconfError.WRONG_OWNER, path)
+        if self.group is not None and st.st_gid != self.group:
+            _raise_security_error(EconfError.WRONG_GROUP, path)
+        max_mode = self.max_dir_mode if is_dir else self.max_mode
+        if max_mode is not None and stat.S_IMODE(st.st_mode) & ~max_mode:
+            if is_dir:
+                _raise_security_error(EconfError.WRONG_DIR_PERMISSION, path)
+            _raise_security_error(EconfError.WRONG_FILE_PERMISSION, path)
+        return True
+
+
+def _raise_security_error(err: EconfError, path: bytes) -> NoReturn:
+    raise _econf_exception(err, f"read_dirs failed with error: {err_string(err.value)}: {os.fsdecode(path)}")
+
+
+class CachedReader:
+    """
+    Cache for read_file which only parses a file again when it changed on disk
+
+    A file counts as unchanged as long as its path, modification and change time, size, inode, mode
+    and owner stay the same, so a cache hit costs a single stat call. Callbacks of read_file_with_callback
+    still run on every call. The least recently used entries are dropped once more
+    than maxsize files are cached. The returned EconfFile objects are shared between all callers and
+    should not be modified.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read_file(
+        self, file_name: str | bytes, delim: str | bytes, comment: str | bytes
+    ) -> EconfFile:
+        """
+        Return the cached keyfile of a config file or read it if it changed
+
+        :param file_name: absolute path of file to be parsed
+        :param delim: delimiter of a key/value e.g. '='
+        :param comment: string that defines the start of a comment e.g. '#'
+        :return: Key-Value storage object
+        """
+        return self._lookup(file_name, delim, comment, None, None)[1]
+
+    def read_file_with_callback(
+        self,
+        file_name: str | bytes,
+        delim: str | bytes,
+        comment: str | bytes,
+        callback: Callable[[any], bool],
+        callback_data: any,
+    ) -> EconfFile:
+        """
+        Return the cached keyfile of a config file or read it with read_file_with_callback if it changed
+
+        The callback is called on every call, also when the cached keyfile is returned, so a changed
+        callback_data or a failing permission check is never skipped.
+
+        :param file_name: absolute path of file to be parsed
+        :param delim: delimiter of a key/value e.g. '='
+        :param comment: string that defines the start of a comment e.g. '#'
+        :param callback: User defined function which will be called and returns a boolean
+        :param callback_data: argument to be give to the callback function
+        :return: Key-Value storage object
+        """
+        return self._lookup(file_name, delim, comment, callback, callback_data)[1]
+
+    def snapshot(
+        self, file_name: str | bytes, delim: str | bytes, comment: str | bytes
+    ) -> dict[str | None, dict[str, str]]:
+        """
+        Return the content of a config file as dictionary, reading it only if it changed
+
+        :param file_name: absolute path of file to be parsed
+        :param delim: delimiter of a key/value e.g. '='
+        :param comment: string that defines the start of a comment e.g. '#'
+        :return: dictionary as returned by to_dict
+        """
+        entry = self._lookup(file_name, delim, comment, None, None)
+        if entry[2] is None:
+            entry[2] = to_dict(entry[1])
+        return entry[2]
+
+    def invalidate(self, file_name: str | bytes | None = None) -> None:
+        """
+        Drop cached entries so the next access parses the file again
+
+        :param file_name: path of the file to be dropped or None to clear the whole cache
+        :return: Nothing
+        """
+        with self._lock:
+            if file_name is None:
+                self._entries.clear()
+                return
+            path = os.path.abspath(_encode_str(file_name))
+            for cache_key in [k for k in self._entries if k[0] == path]:
+                del self._entries[cache_key]
+
+    def _lookup(self, file_name, delim, comment, callback, callback_data) -> list:
+        file_name = _encode_str(file_name)
+        cache_key = (
+            os.path.abspath(file_name),
+            _ensure_valid_char(delim),
+            _ensure_valid_char(comment),
+            callback,
+        )
+        try:
+            signature = _stat_signature(file_name)
+        except OSError:
+            self._discard(cache_key)
+            raise
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            hit = entry is not None and entry[0] == signature
+            if hit:
+                self._entries.move_to_end(cache_key)
+        if hit:
+            # libeconf calls the callback before parsing a file, so it has to accept cached files as well
+            if callback is not None and not callback(callback_data):
+                err = EconfError.PARSING_CALLBACK_FAILED
+                raise _econf_exception(
+                    err, f"read_file_with_callback failed with error: {err_string(err.value)}"
+                )
+            return entry
+        if callback is None:
+            ef = read_file(file_name, delim, comment)
+        else:
+            ef = read_file_with_callback(file_name, delim, comment, callback, callback_data)
+        entry = [signature, ef, None]
+        with self._lock:
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _discard(self, cache_key) -> None:
+        with self._lock:
+            self._entries.pop(cache_key, None)
+
+
+class LayeredConfig:
+    """
+    Configuration read by read_dirs which is only read again when one of its files changed
+
+    The config files, the drop-in directories and every file in them are checked with a single stat
+    call each. As long as none of them changed the previously merged EconfFile is returned. If only the
+    content of already read files changed just those files are parsed again and merged with the others,
+    otherwise all files are read again. The returned EconfFile objects are shared between all callers
+    and should not be modified.
+    """
+
+    def __init__(
+        self,
+        usr_conf_dir: str | bytes,
+        etc_conf_dir: str | bytes,
+        project_name: str | bytes,
+        config_suffix: str | bytes,
+        delim: str | bytes,
+        comment: str | bytes,
+    ):
+        self.usr_conf_dir = _encode_str(usr_conf_dir)
+        self.etc_conf_dir = _encode_str(etc_conf_dir)
+        self.project_name = _encode_str(project_name)
+        self.config_suffix = _encode_str(config_suffix)
+        self.delim = _ensure_valid_char(delim)
+        self.comment = _ensure_valid_char(comment)
+        self._signature = None
+        self._dir_entries = {}
+        self._history = None
+        self._layer_paths = None
+        self._merged = None
+        self._lock = threading.Lock()
+
+    def read_dirs(self) -> EconfFile:
+        """
+        Return the merged configuration like read_dirs, reading the files only if they changed
+
+        :return: merged EconfFile object
+        """
+        with self._lock:
+            self._refresh()
+            return self._merged
+
+    def read_dirs_history(self) -> list[EconfFile]:
+        """
+        Return the single config files like read_dirs_history, reading the files only if they changed
+
+        :return: list of EconfFile objects
+        """
+        with self._lock:
+            self._refresh()
+            return list(self._history)
+
+    def changed(self) -> bool:
+        """
+        Check whether any of the config files or drop-in directories changed since they were last read
+
+        :return: True if the next access will read the files again
+        """
+        with self._lock:
+            return self._history is None or self._scan() != self._signature
+
+    def invalidate(self) -> None:
+        """
+        Forget the current configuration so the next access reads all files again
+
+        :return: Nothing
+        """
+        with self._lock:
+            self._signature = None
+            self._history = None
+            self._layer_paths = None
+            self._merged = None
+
+    def _refresh(self) -> None:
+        signature = self._scan()
+        if self._history is not None:
+            if signature == self._signature:
+                return
+            changed_layers = self._changed_layers(signature)
+            if changed_layers is not None:
+                history = list(self._history)
+                for i in changed_layers:
+                    history[i] = read_file(self._layer_paths[i], self.delim, self.comment)
+                self._apply(signature, history)
+                return
+        history = read_dirs_history(
+            self.usr_conf_dir,
+            self.etc_conf_dir,
+            self.project_name,
+            self.config_suffix,
+            self.delim,
+            self.comment,
+        )
+        self._layer_paths = [os.path.normpath(_encode_str(get_path(i))) for i in history]
+        self._apply(signature, history)
+
+    def _changed_layers(self, signature: tuple) -> list[int] | None:
+        # single files can only be re-read if no file or directory appeared, vanished or was renamed
+        if len(signature) != len(self._signature):
+            return None
+        changed = []
+        for (path, new), (old_path, old) in zip(signature, self._signature):
+            if path != old_path or (new is None) != (old is None):
+                return None
+            if new != old:
+                if path not in self._layer_paths:
+                    return None
+                changed.append(self._layer_paths.index(path))
+        return changed
+
+    def _apply(self, signature: tuple, history: list[EconfFile]) -> None:
+        merged = history[0]
+        for layer in history[1:]:
+            merged = merge_files(merged, layer)
+        self._signature = signature
+        self._history = history
+        self._merged = merged
+
+    def _candidates(self) -> Tuple[list[bytes], list[bytes]]:
+        name = self.project_name
+        if self.config_suffix:
+            name += b"." + self.config_suffix
+        files = []
+        dirs = []
+        for base in (self.usr_conf_dir, self.etc_conf_dir):
+            files.append(os.path.normpath(os.path.join(base, name)))
+            dirs.append(os.path.normpath(os.path.join(base, name + b".d")))
+            for postfix in _CONF_DIRS:
+                dirs.append(os.path.normpath(os.path.join(base, self.project_name + postfix)))
+        return files, dirs
+
+    def _scan(self) -> tuple:
+        files, dirs = self._candidates()
+        signature = []
+        for path in files:
+            signature.append((path, _try_stat_signature(path)))
+        for path in dirs:
+            dir_signature = _try_stat_signature(path)
+            signature.append((path, dir_signature))
+            if dir_signature is None:
+                continue
+            cached = self._dir_entries.get(path)
+            if cached is None or cached[0] != dir_signature:
+                try:
+                    cached = (dir_signature, sorted(os.listdir(path)))
+                except OSError:
+                    cached = (dir_signature, [])
+                self._dir_entries[path] = cached
+            for entry in cached[1]:
+                entry_path = os.path.join(path, entry)
+                signature.append((entry_path, _try_stat_signature(entry_path)))
+        return tuple(signature)
+
+
+# Layout of cache files: header, read_dirs arguments, stat signatures of all config files and
+# directories, then the keyfile like it is pickled: delimiter and comment tag followed by the groups
+# with their keys and values. Strings are prefixed by their length.
+_CACHE_MAGIC = b"PYECONF\0"
+_CACHE_VERSION = 3
+_CACHE_HEADER = struct.Struct("=8sI")
+_CACHE_LENGTH = struct.Struct("=I")
+_CACHE_STAT = struct.Struct("=?qqqQQIII")
+_CACHE_NO_GROUP = 0xFFFFFFFF
+
+
+def compile_cache(
+    cache_file: str | bytes,
+    usr_conf_dir: str | bytes,
+    etc_conf_dir: str | bytes,
+    project_name: str | bytes,
+    config_suffix: str | bytes,
+    delim: str | bytes,
+    comment: str | bytes,
+) -> EconfFile:
+    """
+    Read configuration like read_dirs and store the merged result in a binary cache file
+
+    Together with the configuration the stat signatures of all config files and drop-in directories are
+    stored. read_dirs with the cache parameter uses the cache file as long as none of them changed, which
+    only needs one stat call per file instead of parsing it. The cache file is replaced atomically, so it
+    can be shared by many processes, e.g. under /run. It is readable by everyone only if all config
+    files are, otherwise only by its owner. Cache files which are not owned by the current user or root
+    or which are writable by group or others are never used.
+
+    :param cache_file: path of the cache file
+    :param usr_conf_dir: absolute path of the first directory to be searched
+    :param etc_conf_dir: absolute path of the second directory to be searched
+    :param project_name: basename of the configuration file
+    :param config_suffix: suffix of the configuration file
+    :param delim: delimiter of a key/value e.g. '='
+    :param comment: string that defines the start of a comment e.g. '#'
+    :return: merged EconfFile object
+    """
+    args = (
+        _encode_str(usr_conf_dir),
+        _encode_str(etc_conf_dir),
+        _encode_str(project_name),
+        _encode_str(config_suffix),
+        _ensure_valid_char(delim),
+        _ensure_valid_char(comment),
+    )
+    # the files are checked before they are read, so changes while reading invalidate the cache
+    signature = LayeredConfig(*args)._scan()
+    result = read_dirs(*args)
+    _write_cache(_encode_str(cache_file), args, signature, result)
+    return result
+
+
+def _write_cache(cache_file: bytes, args: tuple, signature: tuple, ef: EconfFile) -> None:
+    data = bytearray(_CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION))
+    _pack_cache_bytes(data, _cache_key(args))
+    data += _CACHE_LENGTH.pack(len(signature))
+    for path, stat_signature in signature:
+        _pack_cache_bytes(data, path)
+        data += _CACHE_STAT.pack(stat_signature is not None, *(stat_signature or (0,) * 8))
+    _pack_key_file(data, ef, "compile_cache")
+    # the cache must not reveal the content of config files to users who cannot read them
+    mode = 0o644
+    for path, stat_signature in signature:
+        if stat_signature is not None and stat.S_ISREG(stat_signature[5]) and not stat_signature[5] & stat.S_IROTH:
+            mode = 0o600
+    import tempfile
+
+    fd, tmp_path = tempfile.mkstemp(prefix=b".", suffix=b".tmp", dir=os.path.dirname(cache_file) or b".")
+    try:
+        try:
+            os.fchmod(fd, mode)
+            _write_all(fd, data)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, cache_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _load_cache(cache_file: bytes, args: tuple) -> EconfFile | None:
+    # returns None if the cache file is missing, damaged, outdated or could have been written by others
+    try:
+        with open(cache_file, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_uid not in (0, os.geteuid()) or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _parse_cache(data, args)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def _parse_cache(data: mmap.mmap, args: tuple) -> EconfFile | None:
+    magic, version = _CACHE_HEADER.unpack_from(data, 0)
+    if magic != _CACHE_MAGIC or version != _CACHE_VERSION:
+        return None
+    cache_key, offset = _unpack_cache_bytes(data, _CACHE_HEADER.size)
+    if cache_key != _cache_key(args):
+        return None
+    (count,) = _CACHE_LENGTH.unpack_from(data, offset)
+    offset += _CACHE_LENGTH.size
+    for _ in range(count):
+        path, offset = _unpack_cache_bytes(data, offset)
+        exists, *stat_signature = _CACHE_STAT.unpack_from(data, offset)
+        offset += _CACHE_STAT.size
+        if _try_stat_signature(path) != (tuple(stat_signature) if exists else None):
+            return None
+    return _unpack_key_file(data, offset)
+
+
+def _pack_key_file(data: bytearray, ef: EconfFile, caller: str) -> None:
+    # delimiter and comment tag followed by the groups with their keys and values
+    data += _econf_delimiter_tag(ef._ptr) + _econf_comment_tag(ef._ptr)
+    groups = list(_iter_group_keys(ef, caller))
+    data += _CACHE_LENGTH.pack(len(groups))
+    c_value = c_void_p()
+    for c_group, c_keys in groups:
+        if c_group is None:
+            data += _CACHE_LENGTH.pack(_CACHE_NO_GROUP)
+        else:
+            _pack_cache_bytes(data, c_group)
+        data += _CACHE_LENGTH.pack(len(c_keys))
+        for c_key in c_keys:
+            err = _econf_getStringValue(ef._ptr, c_group, c_key, byref(c_value))
+            if err:
+                raise _econf_exception(EconfError(err), f"{caller} failed with error: {err_string(err)}")
+            _pack_cache_bytes(data, c_key)
+            _pack_cache_bytes(data, _take_string(c_value))
+
+
+def _unpack_key_file(data: bytes | mmap.mmap | memoryview, offset: int) -> EconfFile:
+    delim = bytes(data[offset : offset + 1])
+    comment = bytes(data[offset + 1 : offset + 2])
+    offset += 2
+    values = {}
+    (count,) = _CACHE_LENGTH.unpack_from(data, offset)
+    offset += _CACHE_LENGTH.size
+    for _ in range(count):
+        (length,) = _CACHE_LENGTH.unpack_from(data, offset)
+        if length == _CACHE_NO_GROUP:
+            group = None
+            offset += _CACHE_LENGTH.size
+        else:
+            group, offset = _unpack_cache_bytes(data, offset)
+        (key_count,) = _CACHE_LENGTH.unpack_from(data, offset)
+        offset += _CACHE_LENGTH.size
+        group_values = values.setdefault(group, {})
+        for _ in range(key_count):
+            key, offset = _unpack_cache_bytes(data, offset)
+            group_values[key], offset = _unpack_cache_bytes(data, offset)
+    result = new_key_file(delim, comment)
+    set_values(result, values)
+    return result
+
+
+def _cache_key(args: tuple) -> bytes:
+    # the conf dirs change which directories read_dirs looks at
+    return b"\0".join(list(args) + _CONF_DIRS)
+
+
+def _pack_cache_bytes(data: bytearray, value: bytes) -> None:
+    data += _CACHE_LENGTH.pack(len(value))
+    data += value
+
+
+def _unpack_cache_bytes(data: bytes | mmap.mmap | memoryview, offset: int) -> Tuple[bytes, int]:
+    (length,) = _CACHE_LENGTH.unpack_from(data, offset)
+    start = offset + _CACHE_LENGTH.size
+    if start + length > len(data):
+        raise ValueError("serialized keyfile is truncated")
+    return bytes(data[start : start + length]), start + length
+
+
+def _unpickle_key_file(data: bytes) -> EconfFile:
+    if not data:
+        return EconfFile(c_void_p())
+    return _unpack_key_file(data, 0)
+
+
+class SharedSnapshot:
+    """
+    Snapshot of a keyfile in shared memory which other processes can load
+
+    Pickling a SharedSnapshot only transfers the name of the shared memory block, so one snapshot can be
+    handed to many multiprocessing or ProcessPoolExecutor workers which call load to get their own
+    EconfFile from it. The process which created the snapshot has to call unlink, or use it as context
+    manager, once the workers are done.
+    """
+
+    def __init__(self, ef: EconfFile):
+        from multiprocessing import shared_memory
+
+        data = bytearray()
+        _pack_key_file(data, ef, "SharedSnapshot")
+        self._shm = shared_memory.SharedMemory(create=True, size=len(data))
+        self._shm.buf[: len(data)] = data
+        self.name = self._shm.name
+
+    def __reduce__(self):
+        return _attach_shared_snapshot, (self.name,)
+
+    def __repr__(self) -> str:
+        return f"SharedSnapshot(name={self.name!r})"
+
+    def __enter__(self) -> "SharedSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.unlink()
+
+    def load(self) -> EconfFile:
+        """
+        Create a new keyfile with the content of the snapshot
+
+        :return: EconfFile object
+        """
+        if self._shm is not None:
+            return _unpack_key_file(self._shm.buf, 0)
+        from multiprocessing import shared_memory
+
+        try:
+            shm = shared_memory.SharedMemory(self.name, track=False)
+        except TypeError:
+            # track was added in Python 3.13
+            shm = shared_memory.SharedMemory(self.name)
+        try:
+            return _unpack_key_file(shm.buf, 0)
+        finally:
+            shm.close()
+
+    def unlink(self) -> None:
+        """
+        Free the shared memory, must only be called by the process which created the snapshot
+
+        :return: Nothing
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def _attach_shared_snapshot(name: str) -> SharedSnapshot:
+    snapshot = SharedSnapshot.__new__(SharedSnapshot)
+    snapshot._shm = None
+    snapshot.name = name
+    return snapshot
+
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_INOTIFY_EVENT = struct.Struct("iIII")
+_LIBC = None
+
+
+def _libc() -> CDLL:
+    global _LIBC
+    if _LIBC is None:
+        libc = CDLL(None, use_errno=True)
+        libc.inotify_init1.restype = c_int
+        libc.inotify_init1.argtypes = (c_int,)
+        libc.inotify_add_watch.restype = c_int
+        libc.inotify_add_watch.argtypes = (c_int, c_char_p, c_uint32)
+        libc.inotify_rm_watch.restype = c_int
+        libc.inotify_rm_watch.argtypes = (c_int, c_int)
+        _LIBC = libc
+    return _LIBC
+
+
+class ConfigWatcher:
+    """
+    Watch the files read by read_dirs with inotify and reload the configuration when they change
+
+    The config files and the drop-in directories are watched directly, their parent directories only
+    to notice config files and drop-in directories being created. Bursts of events are collected until
+    no new event arrived for the debounce interval, then the configuration is reloaded through a
+    LayeredConfig so only the changed files are parsed again. New configurations are passed to all
+    subscribed callbacks and can also be received by iterating over the watcher.
+
+    This is only available on Linux.
+    """
+
+    def __init__(
+        self,
+        usr_conf_dir: str | bytes,
+        etc_conf_dir: str | bytes,
+        project_name: str | bytes,
+        config_suffix: str | bytes,
+        delim: str | bytes,
+        comment: str | bytes,
+        debounce: float = 0.1,
+    ):
+        self._fd = -1
+        self.config = LayeredConfig(
+            usr_conf_dir, etc_conf_dir, project_name, config_suffix, delim, comment
+        )
+        self.debounce = debounce
+        self._callbacks = []
+        self._watches = {}
+        try:
+            libc = _libc()
+        except AttributeError:
+            raise OSError("inotify is not available on this platform") from None
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            err = get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        files, dirs = self.config._candidates()
+        bases = {
+            os.path.normpath(self.config.usr_conf_dir),
+            os.path.normpath(self.config.etc_conf_dir),
+        }
+        self._dirs = set(dirs)
+        self._relevant = set()
+        for path in files + dirs:
+            while path not in self._relevant and path not in bases:
+                self._relevant.add(path)
+                parent = os.path.dirname(path)
+                if parent == path:
+                    break
+                path = parent
+        self._update_watches()
+        self._current = self.config.read_dirs()
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self) -> "ConfigWatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[EconfFile]:
+        while self._fd >= 0:
+            ef = self.wait()
+            if ef is not None:
+                yield ef
+
+    def fileno(self) -> int:
+        """
+        Return the inotify file descriptor e.g. to add it to an event loop
+
+        :return: file descriptor
+        """
+        return self._fd
+
+    def subscribe(self, callback: Callable[[EconfFile], Any]) -> None:
+        """
+        Register a function which is called with every newly loaded configuration
+
+        :param callback: function which gets the merged EconfFile object
+        :return: Nothing
+        """
+        self._callbacks.append(callback)
+
+    def read_dirs(self) -> EconfFile:
+        """
+        Return the most recently loaded configuration
+
+        :return: merged EconfFile object
+        """
+        return self._current
+
+    def wait(self, timeout: float | None = None) -> EconfFile | None:
+        """
+        Block until the configuration changed and return the reloaded configuration
+
+        :param timeout: maximal time in seconds to wait or None to wait forever
+        :return: merged EconfFile object or None if nothing changed within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._fd >= 0:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._wait_readable(remaining):
+                return None
+            if not self.process_events():
+                continue
+            while self._wait_readable(self.debounce):
+                self.process_events()
+            ef = self.reload()
+            if ef is not None:
+                return ef
+        return None
+
+    def process_events(self) -> bool:
+        """
+        Read all pending inotify events without blocking
+
+        :return: True if one of the events concerns the watched configuration
+        """
+        relevant = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                relevant |= self._is_relevant(wd, mask, name)
+        if relevant:
+            self._update_watches()
+        return relevant
+
+    def reload(self) -> EconfFile | None:
+        """
+        Reload the configuration and notify the subscribers if it changed
+
+        :return: merged EconfFile object or None if the configuration did not change
+        """
+        ef = self.config.read_dirs()
+        if ef is self._current:
+            return None
+        self._current = ef
+        for callback in list(self._callbacks):
+            callback(ef)
+        return ef
+
+    def close(self) -> None:
+        """
+        Stop watching and release the inotify file descriptor
+
+        :return: Nothing
+        """
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._watches.clear()
+
+    def _wait_readable(self, timeout: float | None) -> bool:
+        if self._fd < 0:
+            return False
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        return bool(readable)
+
+    def _is_relevant(self, wd: int, mask: int, name: bytes) -> bool:
+        if mask & _IN_Q_OVERFLOW:
+            return True
+        path = self._watches.get(wd)
+        if mask & _IN_IGNORED:
+            self._watches.pop(wd, None)
+            return path in self._dirs
+        if path is None:
+            return False
+        return path in self._dirs or os.path.join(path, name) in self._relevant
+
+    def _update_watches(self) -> None:
+        libc = _libc()
+        watched = set(self._watches.values())
+        for path in self._dirs | {os.path.dirname(i) for i in self._relevant}:
+            if path in watched:
+                continue
+            wd = libc.inotify_add_watch(self._fd, path, _IN_WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = path
+            elif get_errno() not in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                err = get_errno()
+                raise OSError(err, os.strerror(err), path)
+
+
+def watch(
+    usr_conf_dir: str | bytes,
+    etc_conf_dir: str | bytes,
+    project_name: str | bytes,
+    config_suffix: str | bytes,
+    delim: str | bytes,
+    comment: str | bytes,
+    callback: Callable[[EconfFile], Any] | None = None,
+    debounce: float = 0.1,
+) -> ConfigWatcher:
+    """
+    Watch the configuration read by read_dirs and reload it whenever one of its files changes
+
+    Iterate over the returned watcher to receive every new configuration, or pass a callback and
+    drive the watcher with its wait method.
+
+    :param usr_conf_dir: absolute path of the first directory to be searched
+    :param etc_conf_dir: absolute path of the second directory to be searched
+    :param project_name: basename of the configuration file
+    :param config_suffix: suffix of the configuration file
+    :param delim: delimiter of a key/value e.g. '='
+    :param comment: string that defines the start of a comment e.g. '#'
+    :param callback: function which is called with every reloaded configuration
+    :param debounce: time in seconds without new events before the configuration is reloaded
+    :return: ConfigWatcher object
+    """
+    watcher = ConfigWatcher(
+        usr_conf_dir, etc_conf_dir, project_name, config_suffix, delim, comment, debounce
+    )
+    if callback is not None:
+        watcher.subscribe(callback)
+    return watcher
+
+
+class _ReadWriteLock:
+    """
+    Lock which can be held by many readers or a single writer
+
+    Waiting writers block new readers, so a constant stream of readers cannot starve them.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+class SharedConfig:
+    """
+    Keyfile which can be used by many threads at once while it is changed or reloaded
+
+    libeconf itself is not thread-safe, so reading a keyfile while another thread modifies it can crash.
+    Threads read the current keyfile inside read, which many threads can hold at once, and modify it
+    inside write, which waits until no thread is reading. reload creates the new keyfile without
+    holding the lock and only swaps the reference, so readers are never blocked while files are parsed.
+    Threads which still use the old keyfile keep it alive until they are done with it. Changes made by a
+    writer while a reload happens are applied to the old keyfile and so are discarded. The loader is
+    called for the first keyfile and on every reload, e.g. LayeredConfig(...).read_dirs.
+    """
+
+    def __init__(self, loader: Callable[[], EconfFile]):
+        self._loader = loader
+        self._lock = _ReadWriteLock()
+        self._current = loader()
+
+    @property
+    def current(self) -> EconfFile:
+        """
+        The current keyfile, which must not be modified without holding the write lock
+        """
+        return self._current
+
+    @contextmanager
+    def read(self) -> Iterator[EconfFile]:
+        """
+        Context manager which holds the read lock and returns the current keyfile
+
+        :return: EconfFile object
+        """
+        self._lock.acquire_read()
+        try:
+            yield self._current
+        finally:
+            self._lock.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[EconfFile]:
+        """
+        Context manager which holds the write lock and returns the current keyfile to be modified
+
+        The changes are lost if reload replaces the keyfile before the block is left.
+
+        :return: EconfFile object
+        """
+        self._lock.acquire_write()
+        try:
+            yield self._current
+        finally:
+            self._lock.release_write()
+
+    def reload(self, ef: EconfFile | None = None) -> EconfFile:
+        """
+        Replace the current keyfile with a newly loaded one
+
+        Does not wait for writers, changes of a write block which is still active are discarded. Can be
+        subscribed to a ConfigWatcher to always use the latest configuration.
+
+        :param ef: new keyfile, by default the loader is called
+        :return: the new EconfFile object
+        """
+        if ef is None:
+            ef = self._loader()
+        # assigning a reference is atomic, readers either see the old or the new keyfile
+        self._current = ef
+        return ef
+
+
+ASYNC_MAX_WORKERS = 4
+_ASYNC_EXECUTOR = None
+_ASYNC_EXECUTOR_LOCK = threading.Lock()
+
+
+def _async_executor() -> "concurrent.futures.ThreadPoolExecutor":
+    global _ASYNC_EXECUTOR
+    with _ASYNC_EXECUTOR_LOCK:
+        if _ASYNC_EXECUTOR is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _ASYNC_EXECUTOR = ThreadPoolExecutor(
+                max_workers=ASYNC_MAX_WORKERS, thread_name_prefix="econf"
+            )
+        return _ASYNC_EXECUTOR
+
+
+async def _run_async(func: Callable, *args: Any) -> Any:
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_async_executor(), func, *args)
+
+
+async def read_file_async(
+    file_name: str | bytes, delim: str | bytes, comment: str | bytes
+) -> EconfFile:
+    """
+    Read a config file like read_file without blocking the event loop
+
+    The file is read in a thread pool with at most ASYNC_MAX_WORKERS threads
+
+    :param file_name: absolute path of file to be parsed
+    :param delim: delimiter of a key/value e.g. '='
+    :param comment: string that defines the start of a comment e.g. '#'
+    :return: Key-Value storage object
+    """
+    return await _run_async(read_file, file_name, delim, comment)
+
+
+async def merge_files_async(usr_file: EconfFile, etc_file: EconfFile) -> EconfFile:
+    """
+    Merge the content of 2 keyfile objects like merge_files without blocking the event loop
+
+    :param usr_file: first EconfFile object
+    :param etc_file: second EconfFile object
+    :return: merged EconfFile object
+    """
+    return await _run_async(merge_files, usr_file, etc_file)
+
+
+async def read_dirs_async(
+    usr_conf_dir: str | bytes,
+    etc_conf_dir: str | bytes,
+    project_name: str | bytes,
+    config_suffix: str | bytes,
+    delim: str | bytes,
+    comment: str | bytes,
+) -> EconfFile:
+    """
+    Read and merge the configuration like read_dirs without blocking the event loop
+
+    :param usr_conf_dir: absolute path of the first directory to be searched
+    :param etc_conf_dir: absolute path of the second directory to be searched
+    :param project_name: basename of the configuration file
+    :param config_suffix: suffix of the configuration file
+    :param delim: delimiter of a key/value e.g. '='
+    :param comment: string that defines the start of a comment e.g. '#'
+    :return: merged EconfFile object
+    """
+    return await _run_async(
+        read_dirs, usr_conf_dir, etc_conf_dir, project_name, config_suffix, delim, comment
+    )
+
+
+async def read_dirs_history_async(
+    usr_conf_dir: str | bytes,
+    etc_conf_dir: str | bytes,
+    project_name: str | bytes,
+    config_suffix: str | bytes,
+    delim: str | bytes,
+    comment: str | bytes,
+) -> list[EconfFile]:
+    """
+    Read the configuration files like read_dirs_history without blocking the event loop
+
+    :param usr_conf_dir: absolute path of the first directory to be searched
+    :param etc_conf_dir: absolute path of the second directory to be searched
+    :param project_name: basename of the configuration file
+    :param config_suffix: suffix of the configuration file
+    :param delim: delimiter of a key/value e.g. '='
+    :param comment: string that defines the start of a comment e.g. '#'
+    :return: list of EconfFile objects
+    """
+    return await _run_async(
+        read_dirs_history,
+        usr_conf_dir,
+        etc_conf_dir,
+        project_name,
+        config_suffix,
+        delim,
+        comment,
+    )
+
+
+async def watch_async(
+    usr_conf_dir: str | bytes,
+    etc_conf_dir: str | bytes,
+    project_name: str | bytes,
+    config_suffix: str | bytes,
+    delim: str | bytes,
+    comment: str | bytes,
+    debounce: float = 0.1,
+) -> AsyncIterator[EconfFile]:
+    """
+    Asynchronously iterate over the reloaded configurations of read_dirs whenever their files change
+
+    The inotify descriptor of a ConfigWatcher is registered with the running event loop, so no thread
+    is blocked while waiting. Reading the files is done in the thread pool. This is only available on
+    Linux.
+
+    :param usr_conf_dir: absolute path of the first directory to be searched
+    :param etc_conf_dir: absolute path of the second directory to be searched
+    :param project_name: basename of the configuration file
+    :param config_suffix: suffix of the configuration file
+    :param delim: delimiter of a key/value e.g. '='
+    :param comment: string that defines the start of a comment e.g. '#'
+    :param debounce: time in seconds without new events before the configuration is reloaded
+    :return: asynchronous iterator of merged EconfFile objects
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    watcher = await _run_async(
+        ConfigWatcher,
+        usr_conf_dir,
+        etc_conf_dir,
+        project_name,
+        config_suffix,
+        delim,
+        comment,
+        debounce,
+    )
+    readable = asyncio.Event()
+    loop.add_reader(watcher.fileno(), readable.set)
+    try:
+        while True:
+            await readable.wait()
+            readable.clear()
+            if not watcher.process_events():
+                continue
+            while True:
+                await asyncio.sleep(watcher.debounce)
+                if not readable.is_set():
+                    break
+                readable.clear()
+                watcher.process_events()
+            ef = await _run_async(watcher.reload)
+            if ef is not None:
+                yield ef
+    finally:
+        loop.remove_reader(watcher.fileno())
+        watcher.close()
+
+
+def read_many(
+    specs: Iterable[Sequence], max_workers: int | None = None
+) -> list[EconfFile | Exception]:
+    """
+    Read many configurations in parallel using a thread pool
+
+    Every spec is a tuple with the arguments of either read_file (file_name, delim, comment) or read_dirs
+    (usr_conf_dir, etc_conf_dir, project_name, config_suffix, delim, comment). libeconf releases the GIL
+    while reading, so the configurations are parsed concurrently.
+
+    :param specs: argument tuples for read_file or read_dirs
+    :param max_workers: maximal number of threads, by default chosen by ThreadPoolExecutor
+    :return: EconfFile object or the raised exception for every spec, in the order of the specs
+    """
+
+    def read(spec: Sequence) -> EconfFile | Exception:
+        try:
+            if len(spec) == 3:
+                return read_file(*spec)
+            if len(spec) == 6:
+                return read_dirs(*spec)
+            raise TypeError("specs must contain the arguments of read_file or read_dirs")
+        except Exception as e:
+            return e
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read, specs))
+
+
+# marks a Key or Field without default value
+_NO_DEFAULT = object()
+
+# ctypes result type and libeconf getter for every value type supported by Key and Schema
+_VALUE_GETTERS = {
+    int: (c_int64, "econf_getInt64Value"),
+    "uint": (c_uint64, "econf_getUInt64Value"),
+    float: (c_double, "econf_getDoubleValue"),
+    str: (c_void_p, "econf_getStringValue"),
+    bool: (c_bool, "econf_getBoolValue"),
+}
+
+
+class Key:
+    """
+    Handle to a single typed value which can be read from any keyfile
+
+    Group and key are encoded when the handle is created and the matching libeconf getter is looked up
+    on the first get, so later calls only have to call into libeconf. Creating a handle does not load
+    libeconf, so handles can be declared at module level.
+
+    :param group: group of the key or None for keys without a group
+    :param key: key of the value
+    :param type: one of int, "uint", float, str or bool
+    :param default: value returned if group or key do not exist, without default a KeyError is raised
+    """
+
+    __slots__ = ("group", "key", "type", "default", "_c_group", "_c_key", "_c_type", "_func_name", "_func")
+
+    def __init__(
+        self,
+        group: str | bytes | None,
+        key: str | bytes,
+        type: Any = str,
+        default: Any = _NO_DEFAULT,
+    ):
+        if type not in _VALUE_GETTERS:
+            raise TypeError("type must be one of int, 'uint', float, str or bool")
+        if default is not _NO_DEFAULT:
+            _ensure_valid_default(type, default)
+        self.group = group
+        self.key = key
+        self.type = type
+        self.default = default
+        self._c_group = _encode_str(group) if group else None
+        self._c_key = _encode_str(key)
+        self._c_type, self._func_name = _VALUE_GETTERS[type]
+        self._func = None
+
+    def __repr__(self) -> str:
+        return f"Key({self.group!r}, {self.key!r}, {self.type!r})"
+
+    def get(self, ef: EconfFile) -> int | float | str | bool:
+        """
+        Read the value of this key from a keyfile
+
+        :param ef: Key-Value storage object
+        :return: value of the key
+        """
+        func = self._func
+        if func is None:
+            _load_library()
+            func = self._func = globals()["_" + self._func_name]
+        c_result = self._c_type()
+        err = func(ef._ptr, self._c_group, self._c_key, byref(c_result))
+        if err:
+            if self.default is not _NO_DEFAULT and EconfError(err) in (
+                EconfError.NOKEY,
+                EconfError.NOGROUP,
+            ):
+                return self.default
+            raise _econf_exception(EconfError(err), f"get {self!r} failed with error: {err_string(err)}")
+        if self.type is str:
+            return _take_string(c_result).decode("utf-8")
+        return c_result.value
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    Declaration of a single typed setting of a Schema
+
+    :param group: group of the key or None for keys without a group
+    :param key: key of the value
+    :param type: one of int, "uint", float, str or bool
+    :param default: value used if group or key do not exist, without default a KeyError is raised
+    """
+
+    group: str | bytes | None
+    key: str | bytes
+    type: Any = str
+    default: Any = _NO_DEFAULT
+
+
+class Schema:
+    """
+    Set of typed settings which are read from a keyfile in a single pass
+
+    Every field is turned into a Key handle when the schema is created, so group and key names are only
+    encoded once and loading only has to call into libeconf. The values are returned as a frozen
+    dataclass with one attribute per field.
+    """
+
+    def __init__(self, name: str = "Settings", **fields: Field):
+        self._keys = []
+        for attr, spec in fields.items():
+            if not isinstance(spec, Field):
+                raise TypeError(f"{attr} must be declared as Field")
+            self._keys.append((attr, Key(spec.group, spec.key, spec.type, spec.default)))
+        self._record = make_dataclass(name, list(fields), frozen=True)
+
+    def load(self, ef: EconfFile) -> Any:
+        """
+        Read all fields of the schema from a keyfile
+
+        :param ef: Key-Value storage object
+        :return: frozen dataclass instance with the values of all fields
+        """
+        return self._record(**{attr: key.get(ef) for attr, key in self._keys})
+
+
+def _ensure_valid_default(value_type: Any, default: Any) -> None:
+    if value_type == "uint":
+        _ensure_valid_uint(default)
+    elif value_type is int:
+        _ensure_valid_int(default)
+    elif value_type is str:
+        if not isinstance(default, str):
+            raise TypeError('"default" parameter must be of type str')
+    elif not isinstance(default, value_type):
+        raise TypeError(f'"default" parameter must be of type {value_type.__name__}')
+
+
+# Statistics are collected by replacing the public functions of this module with wrappers, so
+# nothing is measured and there is no overhead while they are disabled.
+_STATS = {"calls": {}, "time": {}, "bytes_decoded": 0, "files_read": 0, "errors": {}}
+# reentrant since garbage collection inside a measured call can run __del__ and so free_file
+_STATS_LOCK = threading.RLock()
+_STATS_LOCAL = threading.local()
+_STATS_ORIGINALS = {}
+
+
+def enable_stats() -> None:
+    """
+    Start counting the calls, the time spent, the decoded bytes, the read files and the errors
+
+    All public functions of the module are replaced by measuring wrappers, so only calls made through
+    the module are counted, not those of functions imported with "from econf import ..." before.
+
+    :return: Nothing
+    """
+    import inspect
+
+    with _STATS_LOCK:
+        if _STATS_ORIGINALS:
+            return
+        for name, func in list(globals().items()):
+            if (
+                name.startswith("_")
+                or name in _STATS_FUNCTIONS
+                or not inspect.isfunction(func)
+                or func.__module__ != __name__
+                # coroutines and generators only do their work after they returned
+                or inspect.iscoroutinefunction(func)
+                or inspect.isgeneratorfunction(func)
+                or inspect.isasyncgenfunction(func)
+            ):
+                continue
+            _STATS_ORIGINALS[name] = func
+            globals()[name] = _instrument(name, func, inspect.signature(func))
+
+
+def disable_stats() -> None:
+    """
+    Stop collecting statistics and restore the original functions, the collected statistics are kept
+
+    :return: Nothing
+    """
+    with _STATS_LOCK:
+        globals().update(_STATS_ORIGINALS)
+        _STATS_ORIGINALS.clear()
+
+
+def reset_stats() -> None:
+    """
+    Clear the collected statistics
+
+    :return: Nothing
+    """
+    with _STATS_LOCK:
+        _STATS["calls"].clear()
+        _STATS["time"].clear()
+        _STATS["bytes_decoded"] = 0
+        _STATS["files_read"] = 0
+        _STATS["errors"].clear()
+
+
+def get_stats() -> dict[str, Any]:
+    """
+    Return the statistics collected while enable_stats was active
+
+    calls and time map the name of every called function to the number of calls and the seconds spent
+    in it, including the time of the functions it called. bytes_decoded counts the UTF-8 bytes of all
+    strings returned to the caller, files_read the config files parsed by the read_file, parse_file and
+    the read_dirs_history functions and errors the errors raised to the caller by the name of their
+    EconfError. read_dirs does not report which files it merged, so its files are not counted.
+
+    :return: dictionary with the keys calls, time, bytes_decoded, files_read and errors
+    """
+    with _STATS_LOCK:
+        return {
+            "calls": dict(_STATS["calls"]),
+            "time": dict(_STATS["time"]),
+            "bytes_decoded": _STATS["bytes_decoded"],
+            "files_read": _STATS["files_read"],
+            "errors": dict(_STATS["errors"]),
+        }
+
+
+@contextmanager
+def collect_stats() -> Iterator[dict[str, Any]]:
+    """
+    Context manager which collects the statistics of the calls made inside of it
+
+    Statistics are enabled for the block if they were not enabled before. The returned dictionary is
+    filled like get_stats when the block is left. Calls of other threads during the block are counted
+    as well.
+
+    :return: dictionary which receives the statistics of the block
+    """
+    was_enabled = bool(_STATS_ORIGINALS)
+    before = get_stats()
+    enable_stats()
+    result = {}
+    try:
+        yield result
+    finally:
+        if not was_enabled:
+            disable_stats()
+        after = get_stats()
+        for name, value in after.items():
+            if isinstance(value, dict):
+                result[name] = {
+                    k: v - before[name].get(k, 0) for k, v in value.items() if v != before[name].get(k, 0)
+                }
+            else:
+                result[name] = value - before[name]
+
+
+_STATS_FUNCTIONS = {"enable_stats", "disable_stats", "reset_stats", "get_stats", "collect_stats"}
+
+
+def _instrument(name: str, func: Callable, signature: Any) -> Callable:
+    account = _STATS_ACCOUNTING.get(name)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        depth = getattr(_STATS_LOCAL, "depth", 0)
+        _STATS_LOCAL.depth = depth + 1
+        error = None
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            # errors handled by other functions of this module are not counted
+            if depth == 0 and hasattr(e, "_econf_error"):
+                error = e._econf_error.name
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _STATS_LOCAL.depth = depth
+            with _STATS_LOCK:
+                _STATS["calls"][name] = _STATS["calls"].get(name, 0) + 1
+                _STATS["time"][name] = _STATS["time"].get(name, 0.0) + elapsed
+                if error is not None:
+                    _STATS["errors"][error] = _STATS["errors"].get(error, 0) + 1
+        # strings passed between functions of this module are only counted once
+        decoded = _decoded_size(result) if depth == 0 else 0
+        files = 0
+        if account is not None:
+            files = account(result, signature.bind(*args, **kwargs).arguments)
+        with _STATS_LOCK:
+            _STATS["bytes_decoded"] += decoded
+            _STATS["files_read"] += files
+        return result
+
+    return wrapper
+
+
+def _decoded_size(value: Any) -> int:
+    if type(value) is str:
+        return len(value.encode("utf-8"))
+    if type(value) in (list, tuple):
+        return sum(map(_decoded_size, value))
+    if type(value) is dict:
+        return sum(_decoded_size(k) + _decoded_size(v) for k, v in value.items())
+    return 0
+
+
+def _count_files(count: int) -> Callable[[Any, dict], int]:
+    def account(result: Any, arguments: dict) -> int:
+        return count
+
+    return account
+
+
+def _count_history_files(result: list, arguments: dict) -> int:
+    return len(result)
+
+
+# number of config files read by single functions
+_STATS_ACCOUNTING = {
+    "read_file": _count_files(1),
+    "read_file_with_callback": _count_files(1),
+    "parse_file": _count_files(1),
+    "read_dirs_history": _count_history_files,
+    "read_dirs_history_with_callback": _count_history_files,
+}
@@ -0,0 +1,165 @@
+import os
+import timeit
+
+import pytest
+
+import econf
+
+
+# The benchmarks compare the optimized functions with the equivalent per-call code they replace and
+# print the results, run them with: ECONF_BENCHMARK=1 python -m pytest -s -m benchmark
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not os.environ.get("ECONF_BENCHMARK"), reason="set ECONF_BENCHMARK=1 to run benchmarks"),
+]
+
+
+def best_of(func, number=1, repeat=5):
+    # the fastest run is the one least disturbed by other processes
+    return min(timeit.repeat(func, number=number, repeat=repeat))
+
+
+def report(name, baseline, optimized):
+    print(f"\n{name}: {baseline * 1000:.2f} ms -> {optimized * 1000:.2f} ms ({baseline / optimized:.1f}x)")
+
+
+def generate_config(groups, keys):
+    return "".join(
+        f"[Group {g}]\n" + "".join(f"key{k}=value {g} {k}\n" for k in range(keys)) for g in range(groups)
+    )
+
+
+def test_to_dict():
+    ef = econf.loads(generate_config(50, 100), "=", "#")
+
+    def read_with_getters():
+        return {
+            group: {key: econf.get_string_value(ef, group, key) for key in econf.get_keys(ef, group)}
+            for group in econf.get_groups(ef)
+        }
+
+    def read_with_to_dict():
+        return {group: values for group, values in econf.to_dict(ef).items() if group is not None}
+
+    assert read_with_to_dict() == read_with_getters()
+    baseline = best_of(read_with_getters)
+    optimized = best_of(read_with_to_dict)
+    report("5000 keys, get_groups/get_keys/get_string_value -> to_dict", baseline, optimized)
+
+    assert optimized < baseline
+
+
+def test_key_get():
+    ef = econf.read_file("test/testdata/examples/example.conf", "=", ";")
+    fields = [
+        (None, "foo", float),
+        (None, "foo2", int),
+        ("Group", "Bla", int),
+        ("Group", "Welcome", str),
+        ("First Group", "Welcome", str),
+    ]
+    getters = {int: econf.get_int_value, float: econf.get_float_value, str: econf.get_string_value}
+    keys = [econf.Key(group, key, value_type) for group, key, value_type in fields]
+
+    def read_with_getters():
+        return [getters[value_type](ef, group, key) for group, key, value_type in fields]
+
+    def read_with_keys():
+        return [key.get(ef) for key in keys]
+
+    assert read_with_keys() == read_with_getters()
+    baseline = best_of(read_with_getters, number=10000)
+    optimized = best_of(read_with_keys, number=10000)
+    report("10000 x 5 values, get_*_value -> Key.get", baseline, optimized)
+
+    assert optimized < baseline
+
+
+def test_read_many(tmp_path):
+    specs = []
+    for project in range(300):
+        name = f"project{project}"
+        snippets = tmp_path / "etc" / f"{name}.conf.d"
+        snippets.mkdir(parents=True)
+        (tmp_path / "etc" / f"{name}.conf").write_text(generate_config(10, 20))
+        for snippet in range(5):
+            (snippets / f"{snippet}.conf").write_text(generate_config(1, 20))
+        specs.append((str(tmp_path / "usr"), str(tmp_path / "etc"), name, "conf", "=", "#"))
+
+    def read_sequentially():
+        return [econf.read_dirs(*spec) for spec in specs]
+
+    expected = [econf.to_dict(ef) for ef in read_sequentially()]
+    assert [econf.to_dict(ef) for ef in econf.read_many(specs)] == expected
+    baseline = best_of(read_sequentially, repeat=3)
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        optimized = best_of(lambda: econf.read_many(specs, max_workers=workers), repeat=3)
+        report(f"300 projects, read_dirs -> read_many with {workers} threads", baseline, optimized)
+        workers *= 2
+
+
+def test_set_values():
+    values = {
+        f"Group {g}": {f"key{k}": (k, k * 0.5, f"value {k}", k % 2 == 0)[k % 4] for k in range(1000)}
+        for g in range(100)
+    }
+
+    def set_per_key():
+        ef = econf.new_key_file("=", "#")
+        for group, group_values in values.items():
+            for key, value in group_values.items():
+                econf.set_value(ef, group, key, value)
+        return ef
+
+    def set_at_once():
+        ef = econf.new_key_file("=", "#")
+        econf.set_values(ef, values)
+        return ef
+
+    assert econf.to_dict(set_at_once()) == econf.to_dict(set_per_key())
+    baseline = best_of(set_per_key, repeat=3)
+    optimized = best_of(set_at_once, repeat=3)
+    report("100000 keys, set_value -> set_values", baseline, optimized)
+
+    assert optimized < baseline
+
+
+def test_get_list():
+    numbers = [(i * 7919) % 200001 - 100000 for i in range(100000)]
+    ef = econf.loads("[Group]\nNumbers=" + ";".join(map(str, numbers)) + "\n", "=", "#")
+
+    def split_string_value():
+        return [int(value) for value in econf.get_string_value(ef, "Group", "Numbers").split(";")]
+
+    assert split_string_value() == numbers
+    baseline = best_of(split_string_value)
+    for container in ("list", "array", "numpy"):
+        if container == "numpy":
+            pytest.importorskip("numpy")
+        assert list(econf.get_int_list(ef, "Group", "Numbers", container=container)) == numbers
+        optimized = best_of(lambda: econf.get_int_list(ef, "Group", "Numbers", container=container))
+        report(f"100000 integers, get_string_value and int -> get_int_list as {container}", baseline, optimized)
+
+
+def test_read_dirs_with_callback(tmp_path):
+    snippets = tmp_path / "etc" / "example.conf.d"
+    snippets.mkdir(parents=True)
+    (tmp_path / "etc" / "example.conf").write_text(generate_config(1, 10))
+    for snippet in range(500):
+        (snippets / f"{snippet:03}.conf").write_text(f"[Snippet {snippet}]\nkey=value\n")
+    args = (str(tmp_path / "usr"), str(tmp_path / "etc"), "example", "conf", "=", "#")
+    calls = []
+
+    def not_writable_by_others(path):
+        calls.append(path)
+        return not os.stat(path).st_mode & 0o022
+
+    def read_with_callback():
+        return econf.read_dirs_with_callback(*args, not_writable_by_others, str(snippets))
+
+    assert econf.to_dict(read_with_callback()) == econf.to_dict(econf.read_dirs(*args))
+    assert len(calls) >= 500
+    baseline = best_of(lambda: econf.read_dirs(*args))
+    optimized = best_of(read_with_callback)
+    report("500 snippets, read_dirs -> read_dirs_with_callback checking permissions", baseline, optimized)
@@ -1,5 +1,14 @@
 import pytest
+import asyncio
 import econf
+import io
+import multiprocessing
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import threading
 from contextlib import contextmanager
 from pathlib import Path
 from ctypes import *
@@ -80,6 +89,34 @@ def test_ensure_valid_uint(value, context):
         assert result.value == value
 
 
+def test_library_is_loaded_lazily():
+    code = (
+        "import econf\n"
+        "assert 'LIBECONF' not in vars(econf)\n"
+        "econf.Schema(bla=econf.Field('Group', 'Bla', int, 0))\n"
+        "assert econf.parse_file('test/testdata/examples2/example.conf', '=', '#')\n"
+        "try:\n"
+        "    econf.new_ini_file()\n"
+        "except OSError:\n"
+        "    pass\n"
+        "else:\n"
+        "    raise AssertionError('library was loaded')\n"
+    )
+    env = dict(os.environ, ECONF_LIBRARY="/nonexistent/libeconf.so")
+
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+def test_import_time():
+    code = "import sys, econf; print(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, check=True, text=True)
+    modules = result.stdout.split()
+
+    assert "econf" in modules
+    for slow_module in ("ctypes.util", "asyncio", "concurrent.futures", "tempfile"):
+        assert slow_module not in modules
+
+
 @pytest.mark.parametrize(
     "file,context",
     [
@@ -118,6 +155,62 @@ def test_read_file_with_callback(file, context, data):
         assert econf.delimiter_tag(result) == "="
         assert econf.comment_tag(result) == "#"
 
+
+def test_callback_exception():
+    def failing_function(data):
+        raise RuntimeError(data)
+
+    with pytest.raises(RuntimeError, match="file"):
+        econf.read_file_with_callback("test/testdata/examples/example.conf", "=", "#", failing_function, "file")
+    with pytest.raises(RuntimeError, match="dirs"):
+        econf.read_dirs_with_callback(
+            "test/testdata/examples2/", "test/testdata/examples", "example", "conf", "=", "#", failing_function, "dirs"
+        )
+    with pytest.raises(RuntimeError, match="history"):
+        econf.read_dirs_history_with_callback(
+            "test/testdata/examples2/", "test/testdata/examples", "example", "conf", "=", "#", failing_function, "history"
+        )
+    assert econf._CALLBACKS == {}
+
+
+@pytest.mark.parametrize(
+    "file,delim,comment",
+    [
+        ("test/testdata/examples/example.conf", "=", "#"),
+        ("test/testdata/examples/example.conf", "=", ";"),
+        ("test/testdata/examples2/example.conf", "=", "#"),
+        ("test/testdata/examples/example.conf.d/snippet.conf", "=", "#"),
+    ]
+)
+def test_parse_file(file, delim, comment):
+    expected = econf.to_dict(econf.read_file(file, delim, comment))
+
+    assert econf.parse_file(file, delim, comment) == expected
+
+
+@pytest.mark.parametrize(
+    "data,context",
+    [
+        (b"[valid]\nfoo\n", pytest.raises(SyntaxError)),
+        (b"[Group\nfoo=bar\n", pytest.raises(SyntaxError)),
+        (b"[Group] text\n", pytest.raises(SyntaxError)),
+        (b"[]\nfoo=bar\n", pytest.raises(SyntaxError)),
+        (b" = 5\n", pytest.raises(KeyError)),
+        (b"foo=bar # comment\n\n  [Group]\nfoo = baz\n", does_not_raise()),
+    ]
+)
+def test_parse_bytes(data, context):
+    with context:
+        result = econf.parse_bytes(data, "=", "#")
+
+        assert result == {None: {"foo": "bar"}, "Group": {"foo": "baz"}}
+
+
+def test_parse_file_not_found():
+    with pytest.raises(FileNotFoundError):
+        econf.parse_file("test/testdata/examples/fakefile.conf", "=", "#")
+
+
 @pytest.mark.parametrize(
     "context,delim,comment",
     [
@@ -281,6 +374,403 @@ def test_set_delimiter_tag(ef, context, expected):
         assert result == expected
 
 
+def test_cached_reader(tmp_path):
+    path = tmp_path / "example.conf"
+    shutil.copy("test/testdata/examples/example.conf", path)
+    reader = econf.CachedReader()
+
+    first = reader.read_file(str(path), "=", "#")
+    assert reader.read_file(str(path), "=", "#") is first
+    assert reader.snapshot(str(path), "=", "#")["Group"]["Bla"] == "12311"
+
+    path.write_text("[Group]\nBla=1\n")
+    os.utime(path, ns=(0, 0))
+    second = reader.read_file(str(path), "=", "#")
+    assert second is not first
+    assert econf.get_int_value(second, "Group", "Bla") == 1
+    assert reader.snapshot(str(path), "=", "#") == {"Group": {"Bla": "1"}}
+
+    reader.invalidate(str(path))
+    assert reader.read_file(str(path), "=", "#") is not second
+
+
+def test_cached_reader_callback(tmp_path):
+    path = tmp_path / "example.conf"
+    shutil.copy("test/testdata/examples/example.conf", path)
+    os.chmod(path, 0o644)
+    reader = econf.CachedReader()
+    calls = []
+
+    def check_permissions(data):
+        calls.append(data)
+        return os.stat(path).st_mode & 0o022 == 0
+
+    first = reader.read_file_with_callback(str(path), "=", "#", check_permissions, "data")
+    assert reader.read_file_with_callback(str(path), "=", "#", check_permissions, "data") is first
+    assert reader.read_file_with_callback(str(path), "=", "#", check_permissions, 12345) is first
+    assert calls == ["data", "data", 12345]
+
+    def reject(data):
+        calls.append(data)
+        return data != "other"
+
+    assert reader.read_file_with_callback(str(path), "=", "#", reject, "data") is not None
+    with pytest.raises(Exception, match="parsing callback has failed"):
+        reader.read_file_with_callback(str(path), "=", "#", reject, "other")
+    assert calls[-2:] == ["data", "other"]
+
+    os.chmod(path, 0o666)
+    with pytest.raises(Exception, match="parsing callback has failed"):
+        reader.read_file_with_callback(str(path), "=", "#", check_permissions, "data")
+    assert calls[-1] == "data"
+
+
+def test_cached_reader_lru(tmp_path):
+    reader = econf.CachedReader(maxsize=1)
+    usr_file = "test/testdata/examples/example.conf"
+    etc_file = "test/testdata/examples2/example.conf"
+
+    first = reader.read_file(usr_file, "=", "#")
+    reader.read_file(etc_file, "=", "#")
+
+    assert reader.read_file(usr_file, "=", "#") is not first
+    with pytest.raises(FileNotFoundError):
+        reader.read_file(str(tmp_path / "missing.conf"), "=", "#")
+    with pytest.raises(ValueError):
+        econf.CachedReader(maxsize=0)
+
+
+def test_layered_config(tmp_path):
+    usr_dir = tmp_path / "usr"
+    etc_dir = tmp_path / "etc"
+    shutil.copytree("test/testdata/examples2", usr_dir)
+    shutil.copytree("test/testdata/examples", etc_dir)
+    config = econf.LayeredConfig(str(usr_dir), str(etc_dir), "example", "conf", "=", "#")
+
+    assert config.changed()
+    result = config.read_dirs()
+    assert len(econf.get_keys(result, None)) == 3
+    assert len(econf.get_keys(result, "Group")) == 4
+    assert len(econf.get_groups(result)) == 3
+    assert len(config.read_dirs_history()) == 2
+    assert not config.changed()
+    assert config.read_dirs() is result
+
+    snippet = etc_dir / "example.conf.d" / "snippet.conf"
+    snippet.write_text("abc=7\n")
+    os.utime(snippet, ns=(0, 0))
+    assert config.changed()
+    result = config.read_dirs()
+    assert econf.get_int_value(result, None, "abc") == 7
+    assert len(econf.get_keys(result, "Group")) == 3
+
+    (etc_dir / "example.conf.d" / "other.conf").write_text("[Other]\nkey=value\n")
+    assert config.changed()
+    assert len(config.read_dirs_history()) == 3
+    assert econf.get_string_value(config.read_dirs(), "Other", "key") == "value"
+
+    config.invalidate()
+    assert config.changed()
+
+
+def test_read_dirs_cache(tmp_path):
+    usr_dir = tmp_path / "usr"
+    etc_dir = tmp_path / "etc"
+    shutil.copytree("test/testdata/examples2", usr_dir)
+    shutil.copytree("test/testdata/examples", etc_dir)
+    args = (str(usr_dir), str(etc_dir), "example", "conf", "=", "#")
+    cache = tmp_path / "example.cache"
+    expected = econf.to_dict(econf.read_dirs(*args))
+
+    assert econf.to_dict(econf.compile_cache(str(cache), *args)) == expected
+    inode = cache.stat().st_ino
+    result = econf.read_dirs(*args, cache=str(cache))
+    assert econf.to_dict(result) == expected
+    assert econf.get_int_value(result, "Group", "Bla") == 12311
+    assert cache.stat().st_ino == inode
+
+    (etc_dir / "example.conf.d" / "other.conf").write_text("[Other]\nkey=value\n")
+    result = econf.read_dirs(*args, cache=str(cache))
+    assert econf.get_string_value(result, "Other", "key") == "value"
+    assert cache.stat().st_ino != inode
+    assert econf.to_dict(econf.read_dirs(*args, cache=str(cache))) == econf.to_dict(result)
+
+    cache.write_bytes(b"garbage")
+    assert econf.to_dict(econf.read_dirs(*args, cache=str(cache))) == econf.to_dict(result)
+    assert econf.to_dict(econf.read_dirs(*args, cache=str(tmp_path / "missing" / "example.cache"))) == econf.to_dict(result)
+
+    assert cache.stat().st_mode & 0o777 == (0o644 if all(p.stat().st_mode & 0o004 for p in tmp_path.rglob("*.conf")) else 0o600)
+    cache.chmod(0o666)
+    inode = cache.stat().st_ino
+    assert econf.to_dict(econf.read_dirs(*args, cache=str(cache))) == econf.to_dict(result)
+    assert cache.stat().st_ino != inode
+
+    (etc_dir / "example.conf.d" / "other.conf").chmod(0o600)
+    econf.read_dirs(*args, cache=str(cache))
+    assert cache.stat().st_mode & 0o777 == 0o600
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_watch(tmp_path):
+    usr_dir = tmp_path / "usr"
+    etc_dir = tmp_path / "etc"
+    shutil.copytree("test/testdata/examples2", usr_dir)
+    shutil.copytree("test/testdata/examples", etc_dir)
+    received = []
+
+    with econf.watch(
+        str(usr_dir), str(etc_dir), "example", "conf", "=", "#", received.append, 0.01
+    ) as watcher:
+        first = watcher.read_dirs()
+        assert econf.get_int_value(first, None, "abc") == 5
+        assert watcher.wait(0) is None
+
+        (etc_dir / "example.conf.d" / "snippet.conf").write_text("abc=7\n")
+        result = watcher.wait(5)
+        assert result is not None
+        assert received == [result]
+        assert econf.get_int_value(result, None, "abc") == 7
+
+        (usr_dir / "unrelated.txt").write_text("foo")
+        assert watcher.wait(0.2) is None
+
+        (etc_dir / "example.conf.d" / "other.conf").write_text("[Other]\nkey=value\n")
+        result = next(iter(watcher))
+        assert econf.get_string_value(result, "Other", "key") == "value"
+
+    assert watcher.fileno() == -1
+
+
+def test_read_dirs_security(tmp_path):
+    usr_dir = tmp_path / "usr"
+    etc_dir = tmp_path / "etc"
+    shutil.copytree("test/testdata/examples2", usr_dir)
+    shutil.copytree("test/testdata/examples", etc_dir)
+    snippet_dir = etc_dir / "example.conf.d"
+    for path in (usr_dir / "example.conf", etc_dir / "example.conf", snippet_dir / "snippet.conf"):
+        os.chmod(path, 0o644)
+    os.chmod(snippet_dir, 0o755)
+    args = (str(usr_dir), str(etc_dir), "example", "conf", "=", "#")
+    policy = econf.SecurityPolicy(
+        owner=os.getuid(), group=os.getgid(), max_mode=0o644, max_dir_mode=0o755, allow_symlinks=False
+    )
+
+    assert len(econf.get_groups(econf.read_dirs(*args, security=policy))) == 3
+    with pytest.raises(PermissionError):
+        econf.read_dirs(*args, security=econf.SecurityPolicy(owner=os.getuid() + 1))
+    with pytest.raises(PermissionError):
+        econf.read_dirs(*args, security=econf.SecurityPolicy(max_dir_mode=0o700))
+    os.chmod(snippet_dir / "snippet.conf", 0o666)
+    with pytest.raises(PermissionError):
+        econf.read_dirs(*args, security=policy)
+    os.chmod(snippet_dir / "snippet.conf", 0o644)
+    (snippet_dir / "other.conf").symlink_to(usr_dir / "example.conf")
+    with pytest.raises(PermissionError):
+        econf.read_dirs(*args, security=policy)
+    econf.read_dirs(*args, security=econf.SecurityPolicy(max_mode=0o644))
+
+    # files replaced by those in the etc directory are not read, so they do not need to match
+    (snippet_dir / "other.conf").unlink()
+    usr_snippet_dir = usr_dir / "example.conf.d"
+    usr_snippet_dir.mkdir()
+    os.chmod(usr_snippet_dir, 0o755)
+    shutil.copy(snippet_dir / "snippet.conf", usr_snippet_dir / "snippet.conf")
+    os.chmod(usr_snippet_dir / "snippet.conf", 0o666)
+    os.chmod(usr_dir / "example.conf", 0o666)
+    assert len(econf.get_groups(econf.read_dirs(*args, security=policy))) == 3
+    (etc_dir / "example.conf").unlink()
+    with pytest.raises(PermissionError):
+        econf.read_dirs(*args, security=policy)
+
+
+def test_shared_config():
+    config = econf.SharedConfig(lambda: econf.read_file("test/testdata/examples/example.conf", "=", "#"))
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        try:
+            while not stop.is_set():
+                with config.read() as ef:
+                    assert econf.get_int_value(ef, "Group", "Bla") == 12311
+                    assert econf.get_string_value(ef, "First Group", "Welcome[de]") == "Hallo"
+                    econf.to_dict(ef)
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(os.cpu_count() or 1)]
+    for thread in readers:
+        thread.start()
+    try:
+        for i in range(200):
+            old = config.current
+            new = config.reload()
+            assert config.current is new and new is not old
+            with config.write() as ef:
+                econf.set_int_value(ef, "Group", "Counter", i)
+            with config.read() as ef:
+                assert econf.get_int_value(ef, "Group", "Counter") == i
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+    assert errors == []
+
+
+def test_shared_config_write_during_reload():
+    config = econf.SharedConfig(lambda: econf.read_file("test/testdata/examples/example.conf", "=", "#"))
+    writing = threading.Event()
+    reloaded = threading.Event()
+    written = []
+
+    def writer():
+        with config.write() as ef:
+            writing.set()
+            reloaded.wait(5)
+            econf.set_int_value(ef, "Group", "Bla", 1)
+            written.append(ef)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    assert writing.wait(5)
+    new = config.reload()
+    reloaded.set()
+    thread.join()
+
+    assert config.current is new and written[0] is not new
+    assert econf.get_int_value(written[0], "Group", "Bla") == 1
+    with config.read() as ef:
+        assert econf.get_int_value(ef, "Group", "Bla") == 12311
+
+
+def test_read_async():
+    async def read():
+        return await asyncio.gather(
+            econf.read_file_async("test/testdata/examples/example.conf", "=", "#"),
+            econf.read_dirs_async(
+                "test/testdata/examples2/", "test/testdata/examples/", "example", "conf", "=", "#"
+            ),
+            econf.read_dirs_history_async(
+                "test/testdata/examples2/", "test/testdata/examples/", "example", "conf", "=", "#"
+            ),
+        )
+
+    file, merged, history = asyncio.run(read())
+
+    assert len(econf.get_groups(file)) == 3
+    assert len(econf.get_keys(merged, "Group")) == 4
+    assert len(history) == 2
+    merged = asyncio.run(econf.merge_files_async(file, FILE2))
+    assert len(econf.get_keys(merged, None)) == 4
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_watch_async(tmp_path):
+    usr_dir = tmp_path / "usr"
+    etc_dir = tmp_path / "etc"
+    shutil.copytree("test/testdata/examples2", usr_dir)
+    shutil.copytree("test/testdata/examples", etc_dir)
+
+    async def watch():
+        configs = econf.watch_async(str(usr_dir), str(etc_dir), "example", "conf", "=", "#", 0.01)
+        next_config = asyncio.ensure_future(configs.__anext__())
+        await asyncio.sleep(0.5)
+        (etc_dir / "example.conf.d" / "snippet.conf").write_text("abc=7\n")
+        try:
+            return await asyncio.wait_for(next_config, 5)
+        finally:
+            await configs.aclose()
+
+    result = asyncio.run(watch())
+
+    assert econf.get_int_value(result, None, "abc") == 7
+
+
+def test_read_many():
+    usr_dir = "test/testdata/examples2/"
+    etc_dir = "test/testdata/examples/"
+    specs = [
+        ("test/testdata/examples/example.conf", "=", "#"),
+        (usr_dir, etc_dir, "example", "conf", "=", "#"),
+        ("test/testdata/examples/fakefile.conf", "=", "#"),
+        ("test/testdata/examples/invalid.conf", "=", "#"),
+        ("example.conf",),
+    ] * 10
+
+    result = econf.read_many(specs, max_workers=4)
+
+    assert len(result) == len(specs)
+    for i in range(0, len(specs), 5):
+        assert len(econf.get_groups(result[i])) == 3
+        assert len(econf.get_keys(result[i + 1], "Group")) == 4
+        assert isinstance(result[i + 2], FileNotFoundError)
+        assert isinstance(result[i + 3], SyntaxError)
+        assert isinstance(result[i + 4], TypeError)
+
+
+@pytest.mark.parametrize(
+    "file,expected",
+    [
+        ("test/testdata/examples2/example.conf", b"fooo=bar\nbar=foo\n"),
+        ("test/testdata/examples/example.conf.d/snippet.conf", b"abc=5\nfoo=baz\n\n[Group]\nNumber=5\n"),
+    ]
+)
+def test_dumps(file, expected):
+    ef = econf.read_file(file, "=", "#")
+    out = io.BytesIO()
+    econf.dump(ef, out)
+
+    assert econf.dumps(ef) == expected
+    assert out.getvalue() == expected
+
+
+@pytest.mark.parametrize(
+    "data,context",
+    [
+        (b"foo=bar\n[Group]\nkey = value # comment\n", does_not_raise()),
+        ("foo=bar\n[Group]\nkey=value\n", does_not_raise()),
+        (b"[Group\nkey=value\n", pytest.raises(SyntaxError)),
+    ]
+)
+def test_loads(data, context):
+    with context:
+        result = econf.loads(data, "=", "#")
+
+        assert econf.to_dict(result) == {None: {"foo": "bar"}, "Group": {"key": "value"}}
+        assert econf.to_dict(econf.loads(econf.dumps(result), "=", "#")) == econf.to_dict(result)
+
+
+@pytest.mark.parametrize(
+    "file",
+    [
+        FILE,
+        FILE2,
+        econf.new_ini_file(),
+    ]
+)
+def test_pickle(file):
+    result = pickle.loads(pickle.dumps(file))
+
+    assert result._ptr.value != file._ptr.value
+    assert econf.to_dict(result) == econf.to_dict(file)
+    assert econf.delimiter_tag(result) == econf.delimiter_tag(file)
+    assert econf.comment_tag(result) == econf.comment_tag(file)
+
+
+def _load_snapshot(snapshot):
+    return econf.to_dict(snapshot.load())
+
+
+def test_shared_snapshot():
+    expected = econf.to_dict(FILE2)
+
+    with econf.SharedSnapshot(FILE2) as snapshot:
+        assert econf.to_dict(snapshot.load()) == expected
+        assert len(pickle.dumps(snapshot)) < 100
+        with multiprocessing.Pool(2) as pool:
+            assert pool.map(_load_snapshot, [snapshot] * 4) == [expected] * 4
+
+
 def test_write_file(tmp_path):
     d = str(tmp_path)
     name = "example.conf"
@@ -289,6 +779,68 @@ def test_write_file(tmp_path):
     assert (tmp_path / "example.conf").exists()
 
 
+def test_write_file_atomic(tmp_path):
+    d = str(tmp_path)
+    path = tmp_path / "example.conf"
+
+    assert econf.write_file(FILE2, d, "example.conf", atomic=True, fsync=True, only_if_changed=True)
+    os.chmod(path, 0o640)
+    inode = path.stat().st_ino
+    assert not econf.write_file(FILE2, d, "example.conf", atomic=True, only_if_changed=True)
+    assert path.stat().st_ino == inode
+
+    assert econf.write_file(FILE2, d, "example.conf", atomic=True, fsync=True)
+    assert path.stat().st_ino != inode
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert os.listdir(d) == ["example.conf"]
+    assert econf.to_dict(econf.read_file(str(path), "=", "#")) == econf.to_dict(FILE2)
+
+
+def test_write_file_only_if_changed(tmp_path):
+    d = str(tmp_path)
+    path = tmp_path / "example.conf"
+    path.write_text("foo=outdated\n")
+    inode = path.stat().st_ino
+
+    assert econf.write_file(FILE2, d, "example.conf", fsync=True, only_if_changed=True)
+    assert not econf.write_file(FILE2, d, "example.conf", only_if_changed=True)
+    assert path.stat().st_ino == inode
+    assert os.listdir(d) == ["example.conf"]
+    assert econf.to_dict(econf.read_file(str(path), "=", "#")) == econf.to_dict(FILE2)
+
+
+def test_stats():
+    read_file = econf.read_file
+
+    with econf.collect_stats() as stats:
+        assert econf.read_file is not read_file
+        ef = econf.read_file("test/testdata/examples/example.conf", "=", "#")
+        assert econf.get_string_value(ef, "First Group", "Welcome[de]") == "Hallo"
+        with pytest.raises(KeyError):
+            econf.get_int_value(ef, "Group", "missing")
+        econf.err_string(econf.EconfError.NOGROUP.value)
+        econf.read_dirs("test/testdata/examples2/", "test/testdata/examples", "example", "conf", "=", "#")
+
+    assert econf.read_file is read_file
+    assert stats["calls"]["read_file"] == 1
+    assert stats["calls"]["get_string_value"] == 1
+    assert stats["time"]["read_dirs"] > 0
+    assert stats["bytes_decoded"] == 5 + len(econf.err_string(econf.EconfError.NOGROUP.value).encode())
+    assert stats["files_read"] == 1
+    assert stats["errors"] == {"NOKEY": 1}
+
+    econf.enable_stats()
+    try:
+        econf.reset_stats()
+        ef = econf.read_file("test/testdata/examples2/example.conf", "=", "#")
+        econf.to_dict(ef)
+        assert econf.get_stats()["calls"] == {"read_file": 1, "to_dict": 1}
+    finally:
+        econf.disable_stats()
+    econf.read_file("test/testdata/examples2/example.conf", "=", "#")
+    assert econf.get_stats()["calls"]["read_file"] == 1
+
+
 @pytest.mark.parametrize(
     "context,value,expected",
     [
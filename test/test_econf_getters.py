@@ -1,5 +1,7 @@
 import pytest
+import array
 import econf
+import sys
 from contextlib import contextmanager
 from pathlib import Path
 from ctypes import *
@@ -43,6 +45,75 @@ def test_get_keys(file, context, group, expected):
         assert len(result) == expected
 
 
+@pytest.mark.parametrize(
+    "file,context,group,expected",
+    [
+        (FILE, does_not_raise(), "Group", [b"Bla", b"Welcome[la]", b"Welcome"]),
+        (FILE, does_not_raise(), None, [b"foo", b"foo2"]),
+        (FILE, does_not_raise(), b"Group", [b"Bla", b"Welcome[la]", b"Welcome"]),
+        (FILE, pytest.raises(TypeError), 1, []),
+        (FILE, pytest.raises(KeyError), "a", []),
+    ],
+)
+def test_get_keys_bytes(file, context, group, expected):
+    with context:
+        result = econf.get_keys_bytes(file, group)
+
+        assert sorted(result) == sorted(expected)
+
+
+def _rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * 4096
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="uses /proc/self/statm")
+def test_bulk_reads_do_not_leak():
+    for _ in range(1000):
+        econf.get_groups(FILE)
+        econf.get_keys(FILE, "Group")
+        econf.to_dict(FILE)
+    before = _rss_bytes()
+    for _ in range(100000):
+        econf.get_groups(FILE)
+        econf.get_keys(FILE, "Group")
+        econf.to_dict(FILE)
+    growth = _rss_bytes() - before
+
+    assert growth < 4 * 1024 * 1024
+
+
+@pytest.mark.parametrize(
+    "file,group,expected",
+    [
+        (FILE, None, {"foo": "6.5", "foo2": "-6"}),
+        (FILE, "Group", {"Bla": "12311", "Welcome[la]": "Salve", "Welcome": "Hello"}),
+        (FILE, "First Group", {"Welcome[de]": "Hallo", "Welcome[la]": "Salve"}),
+        (FILE2, None, {"fooo": "bar", "bar": "foo"}),
+    ],
+)
+def test_to_dict(file, group, expected):
+    result = econf.to_dict(file)
+
+    assert expected.items() <= result[group].items()
+    assert file.snapshot() == result
+
+
+@pytest.mark.parametrize("file", [FILE, FILE2])
+def test_iter_items(file):
+    items = econf.iter_items(file)
+    first = next(items)
+    result = [first] + list(items)
+
+    assert first[0] is None
+    assert len(result) == len(set(result))
+    assert result == [
+        (group, key, value)
+        for group, values in econf.to_dict(file).items()
+        for key, value in values.items()
+    ]
+
+
 @pytest.mark.parametrize(
     "file,context,group,key,expected",
     [
@@ -145,3 +216,115 @@ def test_get_bool_value(file, context, group, key, expected):
 
         assert isinstance(result, bool)
         assert result == expected
+
+
+@pytest.mark.parametrize(
+    "func,context,group,key,kwargs,expected",
+    [
+        (econf.get_int_list, does_not_raise(), "Another Group", "Numbers", {}, [2, 20, -200, 0, 232]),
+        (econf.get_int_list, does_not_raise(), "Another Group", "Numbers", {"container": "array"}, array.array("q", [2, 20, -200, 0, 232])),
+        (econf.get_int_list, does_not_raise(), None, "foo2", {}, [-6]),
+        (econf.get_int_list, pytest.raises(ValueError), "Another Group", "Booleans", {}, []),
+        (econf.get_int_list, pytest.raises(ValueError), "Another Group", "Numbers", {"container": "tuple"}, []),
+        (econf.get_float_list, does_not_raise(), "Another Group", "Numbers", {"container": "array"}, array.array("d", [2, 20, -200, 0, 232])),
+        (econf.get_float_list, does_not_raise(), None, "foo", {}, [6.5]),
+        (econf.get_bool_list, does_not_raise(), "Another Group", "Booleans", {}, [True, False]),
+        (econf.get_bool_list, pytest.raises(ValueError), "Another Group", "Numbers", {}, []),
+        (econf.get_string_list, does_not_raise(), "Another Group", "Numbers", {}, ["2", "20", "-200", "0", "232"]),
+        (econf.get_string_list, does_not_raise(), "Another Group", "Booleans", {"separator": "l"}, ["true;fa", "se"]),
+        (econf.get_string_list, pytest.raises(KeyError), "Another Group", "Bools", {}, []),
+    ],
+)
+def test_get_list(func, context, group, key, kwargs, expected):
+    with context:
+        result = func(FILE, group, key, **kwargs)
+
+        assert type(result) == type(expected)
+        assert result == expected
+
+
+def test_get_list_numpy():
+    numpy = pytest.importorskip("numpy")
+    result = econf.get_int_list(FILE, "Another Group", "Numbers", container="numpy")
+
+    assert result.dtype == numpy.int64
+    assert result.tolist() == [2, 20, -200, 0, 232]
+    assert econf.get_bool_list(FILE, "Another Group", "Booleans", container="numpy").tolist() == [True, False]
+
+
+@pytest.mark.parametrize(
+    "context,group,key,locale,expected",
+    [
+        (does_not_raise(), "First Group", "Welcome", "fr_FR.UTF-8", "Bojour"),
+        (does_not_raise(), "First Group", "Welcome", "fr_CA", "Hello"),
+        (does_not_raise(), "First Group", "Welcome", "de_DE.UTF-8@euro", "Hallo"),
+        (does_not_raise(), "First Group", "Welcome", "it_IT", "Ci o"),
+        (does_not_raise(), "First Group", "Welcome", "C", "Hello"),
+        (does_not_raise(), "Group", "Welcome", "la", "Salve"),
+        (does_not_raise(), "Group", "Bla", "de", "12311"),
+        (does_not_raise(), None, "foo", "de", "6.5"),
+        (pytest.raises(KeyError), "Group", "Welcome[la]", "la", ""),
+        (pytest.raises(KeyError), "a", "Welcome", "de", ""),
+    ],
+)
+def test_get_localized_string(context, group, key, locale, expected):
+    with context:
+        assert econf.get_localized_string(FILE, group, key, locale) == expected
+
+
+@pytest.mark.parametrize(
+    "file,context,group,key,value_type,expected",
+    [
+        (FILE, does_not_raise(), "Group", "Bla", int, 12311),
+        (FILE, does_not_raise(), "Group", "Bla", "uint", 12311),
+        (FILE, does_not_raise(), None, "foo", float, 6.5),
+        (FILE, does_not_raise(), "First Group", "Welcome[de]", str, "Hallo"),
+        (FILE, does_not_raise(), b"Another Group", b"Booleans", bool, True),
+        (FILE, pytest.raises(KeyError), "Group", "a", int, 0),
+        (FILE, pytest.raises(KeyError), "a", "Bla", str, "12311"),
+        (FILE, pytest.raises(TypeError), 7, 2, int, 12311),
+        (FILE, pytest.raises(TypeError), "Group", "Bla", list, []),
+    ],
+)
+def test_key_get(file, context, group, key, value_type, expected):
+    with context:
+        handle = econf.Key(group, key, value_type)
+
+        assert handle.get(file) == expected
+        assert handle.get(file) == expected
+
+
+@pytest.mark.parametrize(
+    "context,group,key,value_type,default",
+    [
+        (does_not_raise(), "Group", "a", int, -1),
+        (does_not_raise(), "a", "Bla", str, "default"),
+        (does_not_raise(), "a", "Bla", bool, False),
+        (pytest.raises(TypeError), "Group", "a", int, "default"),
+        (pytest.raises(TypeError), "Group", "a", "uint", -1),
+        (pytest.raises(TypeError), "Group", "a", float, 1),
+    ],
+)
+def test_key_get_default(context, group, key, value_type, default):
+    with context:
+        handle = econf.Key(group, key, value_type, default)
+
+        assert handle.get(FILE) == default
+
+
+def test_mapping():
+    assert list(FILE) == [None, "Another Group", "First Group", "Group"]
+    assert len(FILE) == 4
+    assert "Group" in FILE
+    assert "a" not in FILE
+    assert FILE[None]["foo"] == "6.5"
+    assert FILE["Group"]["Bla"] == "12311"
+    assert FILE["Group"]["Bla"] == "12311"
+    assert dict(FILE["Group"]) == {"Bla": "12311", "Welcome[la]": "Salve", "Welcome": "Hello"}
+    assert "Welcome[de]" in FILE["First Group"]
+    assert list(FILE2) == [None]
+    assert len(FILE2[None]) == 2
+    with pytest.raises(KeyError):
+        FILE["a"]
+    with pytest.raises(KeyError):
+        FILE["Group"]["a"]
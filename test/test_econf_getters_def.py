@@ -126,3 +126,45 @@ def test_get_bool_value_def(file, context, group, key, expected):
 
         assert isinstance(result, bool)
         assert result == expected
+
+
+SCHEMA = econf.Schema(
+    bla=econf.Field("Group", "Bla", int),
+    bla_uint=econf.Field("Group", "Bla", "uint"),
+    foo=econf.Field(None, "foo", float),
+    welcome=econf.Field("Group", "Welcome", str),
+    booleans=econf.Field("Another Group", "Booleans", bool),
+    missing_key=econf.Field("Group", "Invalid Key", int, 5),
+    missing_group=econf.Field("Invalid Group", "Bla", str, "default"),
+)
+
+
+def test_schema_load():
+    result = SCHEMA.load(FILE)
+
+    assert result.bla == 12311
+    assert result.bla_uint == 12311
+    assert result.foo == 6.5
+    assert result.welcome == "Hello"
+    assert result.booleans is True
+    assert result.missing_key == 5
+    assert result.missing_group == "default"
+    assert SCHEMA.load(FILE) == result
+    with pytest.raises(AttributeError):
+        result.bla = 1
+
+
+@pytest.mark.parametrize(
+    "context,field",
+    [
+        (pytest.raises(KeyError), econf.Field("Group", "Invalid Key", int)),
+        (pytest.raises(Exception, match="Parse error"), econf.Field("Group", "Bla", bool)),
+        (pytest.raises(TypeError), econf.Field("Group", "Bla", list)),
+        (pytest.raises(TypeError), econf.Field("Group", "Bla", int, "default")),
+        (pytest.raises(TypeError), econf.Field("Group", "Bla", "uint", -1)),
+        (pytest.raises(TypeError), ("Group", "Bla", int)),
+    ],
+)
+def test_schema_errors(context, field):
+    with context:
+        econf.Schema(value=field).load(FILE)
@@ -114,3 +114,87 @@ def test_set_bool_value(file, context, group, key, value):
         result = econf.get_bool_value(file, group, key)
 
         assert result == value
+
+
+@pytest.mark.parametrize(
+    "context,value,getter",
+    [
+        (does_not_raise(), True, econf.get_bool_value),
+        (does_not_raise(), False, econf.get_bool_value),
+        (does_not_raise(), 5, econf.get_uint_value),
+        (does_not_raise(), -5, econf.get_int_value),
+        (does_not_raise(), 1.5, econf.get_float_value),
+        (does_not_raise(), "value", econf.get_string_value),
+        (pytest.raises(TypeError), [], econf.get_string_value),
+    ],
+)
+def test_set_value(context, value, getter):
+    with context:
+        ef = econf.new_key_file("=", "#")
+        econf.set_value(ef, "Group", "key", value)
+
+        assert getter(ef, "Group", "key") == value
+
+
+def test_set_values():
+    ef = econf.new_key_file("=", "#")
+    values = {
+        None: {"foo": "bar"},
+        "Group": {"bool": True, "uint": 5, "int": -5, "float": 1.5, b"bytes": b"value"},
+        "Generated": {f"key{i}": i for i in range(1000)},
+    }
+
+    econf.set_values(ef, values)
+
+    assert econf.get_string_value(ef, None, "foo") == "bar"
+    assert econf.get_bool_value(ef, "Group", "bool") is True
+    assert econf.get_uint_value(ef, "Group", "uint") == 5
+    assert econf.get_int_value(ef, "Group", "int") == -5
+    assert econf.get_float_value(ef, "Group", "float") == 1.5
+    assert econf.get_string_value(ef, "Group", "bytes") == "value"
+    assert len(ef["Generated"]) == 1000
+    assert econf.get_int_value(ef, "Generated", "key999") == 999
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {"Group": {"valid": 1, "invalid": []}},
+        {"Group": {"valid": 1, "invalid": 99999999999999999999}},
+        {7: {"valid": 1}},
+    ],
+)
+def test_set_values_invalid(values):
+    ef = econf.new_key_file("=", "#")
+
+    with pytest.raises((TypeError, ValueError)):
+        econf.set_values(ef, values)
+    assert len(ef) == 0
+
+
+def test_mapping_invalidation():
+    ef = econf.new_key_file("=", "#")
+    assert ef
+    assert len(ef) == 0
+
+    econf.set_string_value(ef, "Group", "key", "a")
+    group = ef["Group"]
+    assert group["key"] == "a"
+    econf.set_int_value(ef, "Group", "key", 5)
+    assert group["key"] == "5"
+    econf.set_bool_value(ef, "Group", "other", True)
+    assert len(group) == 2
+    econf.set_value(ef, None, "foo", 1.5)
+    assert list(ef) == [None, "Group"]
+    assert "foo" in ef[None]
+
+
+def test_localized_string_invalidation():
+    ef = econf.new_key_file("=", "#")
+    econf.set_string_value(ef, "Group", "Welcome", "Hello")
+    econf.set_string_value(ef, "Group", "Welcome[be@latin]", "Vitaju")
+    assert econf.get_localized_string(ef, "Group", "Welcome", "be_BY@latin") == "Vitaju"
+    assert econf.get_localized_string(ef, "Group", "Welcome", "de_DE") == "Hello"
+
+    econf.set_string_value(ef, "Group", "Welcome[de]", "Hallo")
+    assert econf.get_localized_string(ef, "Group", "Welcome", "de_DE") == "Hallo"